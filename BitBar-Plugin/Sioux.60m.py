@@ -4,10 +4,9 @@
 
 import os
 import sys
+import itertools
 from datetime import datetime
-from scripts.SiouxParser import SiouxParser
-from scripts.SiouxParser import ConfigInput
-from scripts.SiouxParser import DataInput
+from scripts.SiouxClient import SiouxClient
 
 def print_menu_section(section_title, event, show_cat=False):
     menu_section_title = " font=HelveticaNeue size=10"
@@ -42,20 +41,43 @@ def contains_collegues(bdays):
         
 sioux_sun = "iVBORw0KGgoAAAANSUhEUgAAACYAAAAmCAYAAACoPemuAAABemlDQ1BJQ0MgUHJvZmlsZQAAKJF9kM8rRFEUxz8zQ8RIYmFh8cpkoaGZUYydMYmRhQbl1+bNMz+UGa83T8hGWdjOwgbZkPgL2Ej+AaUUFlKyt6BspOdcQ+NHObdz7+eee+63cw64/bppzpUFIJuzrXh/rzY+MalV3FMtq44qwrqRNyPDw0OIfZ0/7eUKlzov25TW3/d/rXommTfAVSncY5iWLTwg3Lxom4qVXoMlRQmvKk4XeUNxosiHHzmj8ajwibBmZPQZ4Vthv5GxsuBW+r7Et5z0N87OLRif9ahOvMnc2IjKF28iT5x+etGI0UeUToJ0y95JGyHa5YadXLLV5+i8uWzNpjO2FpFJJLVYzmj3a6FAsAvUXH/PqxSbl37Cj+AplGKJfTguQONdKebbgdo1ODo1dUv/CHnE3akUPB1AzQTUX0DVVD7VESp25B2E8gfHeW6Fim14W3ec113HeduTzzdwtlGc0acWe9cwugJD57C5BS2iXTv9DjVBZ2v9qKEkAAAACXBIWXMAABYlAAAWJQFJUiTwAAABWWlUWHRYTUw6Y29tLmFkb2JlLnhtcAAAAAAAPHg6eG1wbWV0YSB4bWxuczp4PSJhZG9iZTpuczptZXRhLyIgeDp4bXB0az0iWE1QIENvcmUgNS40LjAiPgogICA8cmRmOlJERiB4bWxuczpyZGY9Imh0dHA6Ly93d3cudzMub3JnLzE5OTkvMDIvMjItcmRmLXN5bnRheC1ucyMiPgogICAgICA8cmRmOkRlc2NyaXB0aW9uIHJkZjphYm91dD0iIgogICAgICAgICAgICB4bWxuczp0aWZmPSJodHRwOi8vbnMuYWRvYmUuY29tL3RpZmYvMS4wLyI+CiAgICAgICAgIDx0aWZmOk9yaWVudGF0aW9uPjE8L3RpZmY6T3JpZW50YXRpb24+CiAgICAgIDwvcmRmOkRlc2NyaXB0aW9uPgogICA8L3JkZjpSREY+CjwveDp4bXBtZXRhPgpMwidZAAAGRUlEQVRYCcWWachVVRSGLccGaNIm06/ZyrKBrEizbCBK6k8TYRZFNNEkEgQFGdkfKUwhKcsK0rJooJFGSisbaaIRmvSjeVLTRq2e5579Xk+3q99n/mjBc/bea6+9ztprr7Pv7dljzWRdzNeBv2rL+tHvCSuKzvm1ljVx0ou3LS9v3IN2DBwMO4J+3oBz4bsyTvAG7byBR0d37UWnOlcGw13gC1pZjG4QKGZWad24m+uWdGWo4+z2RPrTYTNYCrNhCRiEmZwDndAb/gDXGfx+MBQegB9grUXH2fkF9JOhF+gP6cJ7MrwNdt+UtR/RnlLW6fs/S5xfjIcE9ST9vsXjerS+wAyJcjgc1ehVD49+EWS97V7VVLM8yrB7TY74VMzjdCH9rcrycbTPQuvOP0T3OWRTdHuMhJlwP0yD/qC0rq20q3nG6e7Y/AIGZmGPgMhkOuonREFrBj2uT8ErRMkGq9HKZ5dBpYayxAV+1soMyAsW0H9PZZE4Hs84GTBQ9XWWM94b/JK9XhQ3ru0aSXY4kVUuNkhb+RSOBaV+xGdVqh6jaLX7ANYvul1pvwT1s4quNRlFveomC7bH5CfQmZ/9JPCIHMtEOBR+A8deGc/DV2X8Pe1usDW8W3TaXQhKr6ppPs1gTqCprHdSWzeiTBDWkjIcfGH0C+mn/v6s6TPfiS6BqnsMsnG6baXtfJT+1CwDnb0EfSABD6P/PuTlttZQffx7y9i5V2F1chyTA4vBvzKX9E7EIC+yZiJZsCmKR0Ebj9nW7E0Cb3gvXov9fMjxv03/MLgSXoS3YH9Q3LSbneUASRKqUe05l74ve6Km24R+LlDVB0GCf5r+AJVtxE08BLGtt0fW7B8sNvsUXTO4ZMMX+M9AB2fCtjAPPoZ34Cm4A9yxNmZiQ1DMuOUQHCv69mLV3mP/As4FJTYX0Xf+NlCagaVzAMocjz8b54ALVkWuiXo2MW9KXrwFmk7Qz2ll1g1kXQf9xeAfg0GgON+M/Hj6CcJCN+DZNV3m0ib1DSfYtZPMPcyk66y7E9sYTivzY8tcryx03LcobTaHFTAOjoBJcCtMB49Wcb4rSZn4G6rsAP4KPApeRZeAok4ZWTWNTTQzVr/NpxaDds0UlO7+7DKZI2tnm7lry5pku94arL8U6qzjhrhQhfJj1TSe3tJDwDvIAvfLtDWT3nXKeJgD1oeZ96KtizoLXjkEFoJf6YHgveWFfQ14ApuB9+c/vnAdKL4wPzP1Ha2uf0NjZVWP8aPK+swxnkdfH16kihvcCfo5KNKf9ld4IwrbONiA/iegk3lwFTwPr4OZexbuBevsOnDH2p4GEU+gHqBZ1Uasq3odM2x+mV7m2jyiEklMTWc3oYyThkXdKIrSxtadpt5iMpjODEhQv5T+c7T+41DcQGrQJGib32Yz3pAYnMRIgz8gDhK9rXYZz6efF9u+AHeAV8M3oO5l8KseDm+COmt5LES85z4H544uysTTfNmWTMTpGS1GzV2gvwx0JDpdUBtH/xW67SBicH4MmT+1TFxRdNZXjjqbb5ikNu4phjc3tFXKE9TG6G4p8x7PUtgN3NCX4MdzO3xS+gkshX4C+mx8Cn0D+RoMNllsZgtdQ6LIcb6GVoeJfij9D0Anc8BLczIofeAzyFdlQEvAo41kc9uj8DT82C4H/c2FSN6XcTMAd/EKuMAXKOreBXUeow5/Botc8bfVOessYgbUXR0FbTavqgP0oc2hoNTnK015JtoBjI8BM6HMBB1MhU1KX13kZDrO31kU+jFDXjXqTwdFXTJ3N33nktWUEqr2UjfQibWmg7nF/PoyNkuR/AinoLOhwzBw7X3FsHdpJxT9Mtp8/Qm4mLRv4uC84sCjtd52KeNHaJVk2GvBAHZWifiSzI2kP0xlkTG02spEUFZ5hNX0ymecDkR1NmxUpry9dZifF9UdYK3Md1Ak6+vZd2o0+CXr4xmIxD7j1batxoOw/hZMf4peB6PAF13qAGk9EjOtjAC/VG07oQOUVvtK28XT4DzWBLkn/X3Lmui826wt7zIl+mpUPYfT5Lf1R/rx0e0jrDvrTr81iNaxR3kGLAIzJSeAkjquRmv59EWtqTcYd14PKrVljfp/zYAeh9GgZL4a/U9Pv+Qdau/uVlB/A53nomvealu9AAAAAElFTkSuQmCC"
 
-# Initilalise parser and authenticate
-parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet, path_config_file=os.path.join(os.path.abspath(os.path.dirname(sys.argv[0])), 'scripts'))
-
 # Set filters
-filter_event = parser.filter_events_category(social_partner=True, social_colleague=True, powwow=True, training=True, exp_group=True, presentation=True)
-filter_date = parser.filter_events_date(one_day=True, mul_day=True, today=False, future=True, past=False)
-filter_bday_date = parser.filter_bday_date(today=True, future=True, past=False)
-filter_bday_category = parser.filter_bday_category(collegue=True, child=True, partner=True, age=False)
+filter_event = dict(social_partner=True, social_colleague=True, powwow=True, training=True, exp_group=True, presentation=True)
+filter_date = dict(one_day=True, mul_day=True, today=False, future=True, past=False)
+filter_bday_date = dict(today=True, future=True, past=False)
+filter_bday_category = dict(collegue=True, child=True, partner=True, age=False)
+event_queries = [(filter_event, filter_date, "", 1),
+                 (filter_event, filter_date, "in the cloud", 1),
+                 (filter_event, filter_date, "Linux Kennisdelen", 1)]
+
+def query_daemon():
+    # Answered by a running 'SiouxParser.py daemon' in milliseconds.
+    client = SiouxClient()
+    next_events = client.parse_events_multi(event_queries)
+    bdays = client.parse_birthdays(filter_bday_category, filter_bday_date)
+    return next_events, bdays, client.get_events_overview_url(), client.get_base_url()
+
+def query_parser():
+    # No daemon: initialise the parser, authenticate and parse in this process.
+    from scripts.SiouxParser import SiouxParser
+    from scripts.SiouxParser import ConfigInput
+    from scripts.SiouxParser import DataInput
+
+    scripts_dir = os.path.join(os.path.abspath(os.path.dirname(sys.argv[0])), 'scripts')
+    parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet, path_config_file=scripts_dir, path_cache_dir=os.path.join(scripts_dir, 'cache'))
+    parser.prefetch()
+    next_events = parser.parse_events_multi([(parser.filter_events_category(**cat), parser.filter_events_date(**date), title, limit)
+                                             for cat, date, title, limit in event_queries])
+    bdays = parser.iter_birthdays(parser.filter_bday_category(**filter_bday_category), parser.filter_bday_date(**filter_bday_date))
+    return next_events, bdays, parser.get_events_overview_url(), parser.get_base_url()
 
-# Get events
-next_general_event = parser.get_next_event(filter_event, filter_date)
-cloud_event = parser.get_next_event(filter_event, filter_date, "in the cloud")
-linux_event = parser.get_next_event(filter_event, filter_date, "Linux Kennisdelen")
-bdays = parser.parse_birthdays(filter_bday_category, filter_bday_date)
+# Get events and birthdays
+try:
+    next_events, all_bdays, events_overview_url, base_url = query_daemon()
+except RuntimeError:
+    next_events, all_bdays, events_overview_url, base_url = query_parser()
+next_general_event, cloud_event, linux_event = [events[0] if events else [] for events in next_events]
+bdays = list(itertools.islice((bday for bday in all_bdays if bday['role'] == 'collegue'), 2))
 
 # These prints define the menu, starting with the visible text in the menu bar (in this case, an image)
 print "| templateImage=%s" % sioux_sun
@@ -68,9 +90,9 @@ if linux_event != []:
     print_menu_section("The next Linux event is:", linux_event)
 if contains_collegues(bdays):
     print_bdays("The next birthdays are:", bdays, 2)
-print "View all events | href=%s" % parser.get_events_overview_url()
+print "View all events | href=%s" % events_overview_url
 print "---"
-print "Visit Intranet | href=%s" % parser.get_base_url()
+print "Visit Intranet | href=%s" % base_url
 print "Visit Webmail | href=http://webmail.sioux.eu"
 print "---"
 print "Force refresh (current interval: %s) | size=8 refresh=true" % sys.argv[0].split('.')[1]
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+import os
+import json
+import socket
+
+
+class SiouxClient:
+    """
+    Client for the daemon mode of SiouxParser (SiouxDaemon). It only uses the standard library, so it starts quickly.\n
+    Filters are passed as the keyword arguments of the filter_* methods of SiouxParser, e.g.
+    filter_cat={'social_partner': True, 'social_colleague': True, 'powwow': True, 'training': True, 'exp_group': True, 'presentation': True}\n
+    """
+    _SOCKET_FILE = '~/.sioux_parser.sock'
+
+    def __init__(self, path_socket=None, timeout=2.0):
+        """
+        :param path_socket: Path of the Unix socket of the daemon. (default: ~/.sioux_parser.sock) (optional)\n
+        :param timeout:     Seconds to wait for the daemon. (float) (default: 2.0)\n
+        """
+        self._path_socket = os.path.expanduser(path_socket if path_socket is not None else self._SOCKET_FILE)
+        self._timeout = timeout
+
+    def _call(self, method, **params):
+        """
+        Send one request to the daemon.\n
+
+        :return: Result of the method.\n
+        """
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self._timeout)
+        try:
+            try:
+                connection.connect(self._path_socket)
+                connection.sendall(json.dumps({'method': method, 'params': params}) + '\n')
+                chunks = []
+                while not chunks or not chunks[-1].endswith('\n'):
+                    chunk = connection.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            except socket.error as e:
+                raise RuntimeError("Could not reach the daemon on '%s': %s" % (self._path_socket, e))
+        finally:
+            connection.close()
+
+        try:
+            answer = json.loads(''.join(chunks))
+        except ValueError:
+            raise RuntimeError('Invalid answer from the daemon.')
+        if 'error' in answer:
+            raise RuntimeError(answer['error'])
+        return answer['result']
+
+    def parse_events(self, filter_cat, filter_date, filter_title=""):
+        return self._call('parse_events', filter_cat=filter_cat, filter_date=filter_date, filter_title=filter_title)
+
+    def get_next_event(self, filter_cat, filter_date, filter_title=""):
+        return self._call('get_next_event', filter_cat=filter_cat, filter_date=filter_date, filter_title=filter_title)
+
+    def parse_events_multi(self, queries):
+        return self._call('parse_events_multi', queries=queries)
+
+    def parse_birthdays(self, filter_bday_category, filter_bday_date):
+        return self._call('parse_birthdays', filter_bday_category=filter_bday_category, filter_bday_date=filter_bday_date)
+
+    def get_changes(self):
+        return self._call('get_changes')
+
+    def get_base_url(self):
+        return self._call('get_base_url')
+
+    def get_events_overview_url(self):
+        return self._call('get_events_overview_url')
+
+    def status(self):
+        return self._call('status')
@@ -0,0 +1,246 @@
+#!/usr/bin/python
+
+import threading
+import time
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from HTMLParser import HTMLParseError
+
+from SiouxParser import Event
+from SiouxParser import SiouxParser
+from SiouxParser import _HtmlExtractor
+
+
+def _extract_fields(arguments):
+    """
+    Run the html extractor over a page, in a worker process.\n
+
+    :param arguments: Tuple (html stream, selectors) (see _HtmlExtractor)\n
+    :return: Texts and links per selector name (Dictionary with selector name as key and a list of tuples (text, hrefs) as value.), None if the page is not valid html.\n
+    """
+    parseable_text, selectors = arguments
+    try:
+        fields = _HtmlExtractor(selectors).extract(parseable_text)
+    except HTMLParseError:
+        return None
+    return dict((name, [(match.text, match.hrefs) for match in matches]) for name, matches in fields.items())
+
+
+class _Parsed(object):
+    """
+    Result of a page parsed in this process, with the interface of the AsyncResult of a process pool.\n
+    """
+    def __init__(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+
+class EnrichedEvent(Event):
+    """
+    Event with the details found on its own page. Fields that are not found are None.\n
+    """
+    __slots__ = ('description', 'time', 'organiser')
+    _KEYS = Event._KEYS + ('description', 'time', 'organiser')
+
+    def __init__(self, event, description, time_of_day, organiser):
+        Event.__init__(self, event.dates, event.title, event.location, event.category, event.url)
+        self.description = description
+        self.time = time_of_day
+        self.organiser = organiser
+
+    def as_dict(self):
+        """
+        :return: Event (Dictionary with keys: date, title, location, category, url, description, time, organiser.)\n
+        """
+        result = Event.as_dict(self)
+        result.update({'description': self.description, 'time': self.time, 'organiser': self.organiser})
+        return result
+
+
+class SiouxCrawler:
+    """
+    Crawler over the events overview (following its pagination and optional archive pages) and the page of every event.\n
+    Pages are fetched by a bounded pool of threads with a minimum delay between two requests, the html is parsed in a
+    pool of worker processes. The details of an event page are cached per URL, so a crawl only fetches the pages of
+    new events or of which the cached details expired.\n
+    Selectors are read from the optional CRAWL section of the configuration (keys ELEMENT_DETAIL, ARG_DETAIL,
+    VALUE_DESCRIPTION, VALUE_TIME, VALUE_ORGANISER, ELEMENT_NEXT, ARG_NEXT, VALUE_NEXT) or passed as arguments.\n
+    """
+    _CACHE_FILE = 'sioux_crawl.json'
+    _CACHE_VERSION = 1
+    _CACHE_TTL = 24 * 60 * 60
+    _DETAIL_FIELDS = [('description', 'VALUE_DESCRIPTION'), ('time', 'VALUE_TIME'), ('organiser', 'VALUE_ORGANISER')]
+
+    def __init__(self, parser, detail_selectors=None, next_page_selector=None, archive_urls=None, workers=4, processes=None,
+                 delay=0.2, max_pages=12, cache_ttl=None):
+        """
+        :param parser:             Authenticated parser, its session, configuration and cache directory are used. (SiouxParser)\n
+        :param detail_selectors:   Fields of an event page. (Dictionary with description, time, organiser as key and a tuple (element, attribute, value) as value.) (default: CRAWL configuration) (optional)\n
+        :param next_page_selector: Link to the next overview page. (tuple (element, attribute, value)) (default: CRAWL configuration, no pagination without it) (optional)\n
+        :param archive_urls:       Extra overview pages, e.g. the archive of past months. (list of strings) (optional)\n
+        :param workers:            Maximum number of concurrent requests. (int) (default: 4)\n
+        :param processes:          Number of parsing processes, 0 parses in this process. (int) (default: number of CPUs)\n
+        :param delay:              Minimum number of seconds between the start of two requests. (float) (default: 0.2)\n
+        :param max_pages:          Maximum number of overview pages followed through the pagination. (int) (default: 12)\n
+        :param cache_ttl:          Seconds the details of an event page are cached. (default: one day) (optional)\n
+        """
+        self._parser = parser
+        self._workers = workers
+        self._processes = processes
+        self._delay = delay
+        self._max_pages = max_pages
+        self._cache_ttl = cache_ttl if cache_ttl is not None else self._CACHE_TTL
+        self._archive_urls = archive_urls or []
+
+        if detail_selectors is None:
+            detail_selectors = {}
+            element, attr = self._get_config('ELEMENT_DETAIL'), self._get_config('ARG_DETAIL')
+            for field, key in self._DETAIL_FIELDS:
+                value = self._get_config(key)
+                if element is not None and value is not None:
+                    detail_selectors[field] = (element, attr, value)
+        self._detail_selectors = [(field, element.lower(), attr, value, None) for field, (element, attr, value) in detail_selectors.items()]
+
+        if next_page_selector is None and self._get_config('ELEMENT_NEXT') is not None:
+            next_page_selector = (self._get_config('ELEMENT_NEXT'), self._get_config('ARG_NEXT'), self._get_config('VALUE_NEXT'))
+        self._overview_selectors = list(parser._ev_selectors)
+        if next_page_selector is not None:
+            element, attr, value = next_page_selector
+            self._overview_selectors.append(('next', element.lower(), attr, value, None))
+
+        self._request_lock = threading.Lock()
+        self._next_request = 0
+
+        cached = parser._read_cache(self._CACHE_FILE)
+        self._details = cached['details'] if cached is not None and cached.get('version') == self._CACHE_VERSION else {}
+
+    def _get_config(self, key):
+        if not self._parser._has_config('CRAWL', key):
+            return None
+        return self._parser._get_config('CRAWL', key)
+
+    def _fetch(self, url):
+        """
+        Fetch a page, respecting the minimum delay between two requests.\n
+
+        :param url: url to get html from.\n
+        :return: html stream (string)\n
+        """
+        with self._request_lock:
+            now = time.time()
+            start = max(now, self._next_request)
+            self._next_request = start + self._delay
+        if start > now:
+            time.sleep(start - now)
+        return self._parser._fetch_data(url)
+
+    def _parse(self, process_pool, parseable_text, selectors):
+        if process_pool is None:
+            return _Parsed(_extract_fields((parseable_text, selectors)))
+        return process_pool.apply_async(_extract_fields, [(parseable_text, selectors)])
+
+    def _overview_events(self, url, fields):
+        """
+        Convert the fields of an overview page into events, like SiouxParser._parse_events_html.\n
+
+        :return: Events (list of Event)\n
+        """
+        if fields is None or len(set(len(fields[name]) for name in ['date', 'title', 'location', 'category'])) != 1 \
+                or not all(hrefs for _, hrefs in fields['title']):
+            raise RuntimeError("Could not parse the events on '%s'." % url)
+
+        p = self._parser
+        return [Event(p._parse_event_date(date_text), p._prettify_string(title_text), p._prettify_string(location_text),
+                      p._prettify_string(category_text), p._base_url + title_hrefs[0])
+                for (date_text, _), (title_text, title_hrefs), (location_text, _), (category_text, _)
+                in zip(fields['date'], fields['title'], fields['location'], fields['category'])]
+
+    def _overview(self, thread_pool, process_pool):
+        """
+        Collect the events of the overview pages: the pagination is followed page by page, archive pages are fetched
+        concurrently. An event found on several pages is kept once.\n
+
+        :return: Events (list of Event)\n
+        """
+        pages = []
+        url = self._parser.get_events_overview_url()
+        seen = set()
+        while url is not None and url not in seen and len(seen) < self._max_pages:
+            seen.add(url)
+            fields = self._parse(process_pool, self._fetch(url), self._overview_selectors).get()
+            pages.append((url, fields))
+            links = fields.get('next') if fields is not None else None
+            url = self._parser._base_url + links[0][1][0] if links and links[0][1] else None
+
+        archive = [url for url in self._archive_urls if url not in seen]
+        parsing = [(url, self._parse(process_pool, page, self._overview_selectors)) for url, page in zip(archive, thread_pool.map(self._fetch, archive))]
+        pages.extend((url, fields.get()) for url, fields in parsing)
+
+        events = []
+        urls = set()
+        for url, fields in pages:
+            for event in self._overview_events(url, fields):
+                if event.url not in urls:
+                    urls.add(event.url)
+                    events.append(event)
+        return events
+
+    def _details_of(self, fields):
+        details = {}
+        for field, _, _, _, _ in self._detail_selectors:
+            matches = fields.get(field) if fields is not None else None
+            details[field] = self._parser._prettify_string(matches[0][0]) if matches else None
+        return details
+
+    def crawl(self):
+        """
+        Crawl the overview pages and the pages of their events.\n
+
+        :return: Events in the order of the overview pages (Generator of EnrichedEvent)\n
+        """
+        thread_pool = ThreadPool(self._workers)
+        process_pool = Pool(self._processes) if self._processes != 0 else None
+        try:
+            events = self._overview(thread_pool, process_pool)
+
+            now = time.time()
+            missing = [event.url for event in events if event.url not in self._details or now - self._details[event.url]['fetched'] > self._cache_ttl]
+            parsing = {}
+            pending = set(missing)
+            # Pages are parsed as soon as they are fetched, events are yielded in order while the rest is still being fetched.
+            position = 0
+            for url, page in zip(missing, thread_pool.imap(self._fetch, missing)):
+                parsing[url] = self._parse(process_pool, page, self._detail_selectors)
+                pending.discard(url)
+                while position < len(events) and events[position].url not in pending:
+                    yield self._enriched(events[position], parsing)
+                    position += 1
+
+            for event in events[position:]:
+                yield self._enriched(event, parsing)
+        finally:
+            thread_pool.close()
+            if process_pool is not None:
+                process_pool.close()
+                process_pool.join()
+            thread_pool.join()
+            self._parser._write_cache(self._CACHE_FILE, {'version': self._CACHE_VERSION, 'details': self._details})
+
+    def _enriched(self, event, parsing):
+        if event.url in parsing:
+            fields = parsing.pop(event.url).get()
+            self._details[event.url] = {'fetched': time.time(), 'details': self._details_of(fields)}
+        details = self._details[event.url]['details']
+        return EnrichedEvent(event, details.get('description'), details.get('time'), details.get('organiser'))
+
+
+# Main program:
+if __name__ == "__main__":
+    from SiouxParser import ConfigInput
+    from SiouxParser import DataInput
+
+    crawler = SiouxCrawler(SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet))
+    for crawled_event in crawler.crawl():
+        print '%s | %s | %s | %s' % (crawled_event.date, crawled_event.title, crawled_event.time, crawled_event.organiser)
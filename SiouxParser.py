@@ -1,19 +1,1175 @@
 #!/usr/bin/python
 
-import locale
 import netrc
 import os
 import re
-import requests
-import urllib
+import sys
 import ConfigParser
-from bs4 import BeautifulSoup
-from datetime import datetime
-from requests_ntlm import HttpNtlmAuth
-import boto3
-import botocore
+from datetime import date, datetime
 import json
-from boto3.dynamodb.conditions import Key, Attr
+import time
+import hashlib
+import mmap
+import struct
+import codecs
+import stat
+import threading
+import socket
+from array import array
+from bisect import bisect_left, bisect_right
+from HTMLParser import HTMLParser, HTMLParseError
+from htmlentitydefs import name2codepoint
+
+# requests, requests_ntlm, bs4, boto3 and botocore are imported by the code of the ConfigInput/DataInput backend that
+# needs them, so a run only pays for the imports of the backends it selected. (checked by tools/SiouxImportTime.py)
+
+
+def _json_default(o):
+    """
+    Serialize dates and columns for json.dump.\n
+
+    :param o: Object that json can not serialize by itself.\n
+    :return: ISO formatted date (string) or the values of a column (list)\n
+    """
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, (_StringColumn, _DateColumn, _DateListColumn)):
+        return list(o)
+    raise TypeError('%r is not JSON serializable' % o)
+
+
+class DateParser:
+    """
+    Locale independent parsing of the dates found on the intranet and in the JSON files.\n
+    Month names are looked up in a built-in Dutch/English table, parsed dates are memoized.\n
+    """
+    _MONTHS = {
+        'jan': 1, 'januari': 1, 'january': 1,
+        'feb': 2, 'februari': 2, 'february': 2,
+        'mrt': 3, 'maa': 3, 'maart': 3, 'mar': 3, 'march': 3,
+        'apr': 4, 'april': 4,
+        'mei': 5, 'may': 5,
+        'jun': 6, 'juni': 6, 'june': 6,
+        'jul': 7, 'juli': 7, 'july': 7,
+        'aug': 8, 'augustus': 8, 'august': 8,
+        'sep': 9, 'sept': 9, 'september': 9,
+        'okt': 10, 'oct': 10, 'oktober': 10, 'october': 10,
+        'nov': 11, 'november': 11,
+        'dec': 12, 'december': 12
+    }
+
+    _EVENT_DATE = re.compile(r"(\d\d) +([a-z]+) '(\d\d)")
+    _DAY_MONTH = re.compile(r'^\s*(\d{1,2})\.? +([^\W\d_]+)\.?\s*$', re.UNICODE)
+    _MONTH_DAY = re.compile(r'^\s*([^\W\d_]+)\.? +(\d{1,2})\s*$', re.UNICODE)
+    _ISO_DATE = re.compile(r'^\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*$')
+    _DMY_DATE = re.compile(r'^\s*(\d{1,2})-(\d{1,2})-(\d{4})\s*$')
+
+    _MEMO_SIZE = 4096
+    _memo = {}
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def _month(cls, name):
+        try:
+            return cls._MONTHS[name.lower()]
+        except KeyError:
+            raise ValueError("Unknown month '%s'" % name)
+
+    @classmethod
+    def _memoized(cls, kind, string, parse):
+        key = (kind, string)
+        try:
+            return cls._memo[key]
+        except KeyError:
+            pass
+
+        if len(cls._memo) >= cls._MEMO_SIZE:
+            cls._memo.clear()
+        value = cls._memo[key] = parse(string)
+        return value
+
+    @classmethod
+    def _match(cls, pattern, string):
+        m = pattern.match(string)
+        if m is None:
+            raise ValueError("Date '%s' does not match '%s'" % (string, pattern.pattern))
+        return m.groups()
+
+    @classmethod
+    def event_dates(cls, string):
+        """
+        Parse a string to find all event dates, e.g. "16 okt '17 - 18 okt '17".\n
+
+        :param string: Human readable date.\n
+        :return: Dates (List of datetime.date) or None if no date was found.\n
+        """
+        m = cls._EVENT_DATE.findall(string)
+        if not m:
+            return None
+
+        dates = []
+        for day, month, year in m:
+            # Two digit years follow the strptime convention: 69-99 -> 1969-1999, 00-68 -> 2000-2068
+            year = int(year)
+            year += 1900 if year >= 69 else 2000
+            dates.append(cls._memoized('event', (day, month, year), lambda d: date(d[2], cls._month(d[1]), int(d[0]))))
+        return dates
+
+    @classmethod
+    def day_month(cls, string, year):
+        """
+        Parse a day and month in Dutch ("16 nov", "16 mei") or English ("Nov 16", "May 16") notation.\n
+
+        :param string: Human readable day and month.\n
+        :param year:   Year of the date. (int)\n
+        :return: Date (datetime.date)\n
+        """
+        def parse(d):
+            if d[0][:1].strip().isdigit():
+                day, month = cls._match(cls._DAY_MONTH, d[0])
+            else:
+                month, day = cls._match(cls._MONTH_DAY, d[0])
+            return date(d[1], cls._month(month), int(day))
+
+        return cls._memoized('day_month', (string, year), parse)
+
+    @classmethod
+    def iso(cls, string):
+        """
+        Parse an ISO formatted date (YYYY-MM-DD).\n
+
+        :param string: ISO date.\n
+        :return: Date (datetime.date)\n
+        """
+        return cls._memoized('iso', string, lambda d: date(*[int(x) for x in cls._match(cls._ISO_DATE, d)]))
+
+    @classmethod
+    def dmy(cls, string):
+        """
+        Parse a DD-MM-YYYY formatted date.\n
+
+        :param string: Date.\n
+        :return: Date (datetime.date)\n
+        """
+        return cls._memoized('dmy', string, lambda d: date(*[int(x) for x in reversed(cls._match(cls._DMY_DATE, d))]))
+
+
+class _HtmlMatch(object):
+    """
+    Element found by _HtmlExtractor.\n
+    """
+    __slots__ = ('name', 'element', 'attrs', 'parent', 'section', 'parts', 'hrefs', 'depth')
+
+    def __init__(self, name, element, attrs, parent, section):
+        self.name = name
+        self.element = element
+        self.attrs = attrs
+        self.parent = parent
+        self.section = section
+        self.parts = []
+        self.hrefs = []
+        self.depth = 1
+
+    @property
+    def text(self):
+        return u''.join(self.parts)
+
+
+class _HtmlExtractor(HTMLParser):
+    """
+    Single pass html extractor.\n
+    Instead of building a complete tree, only the text and links of the elements matching one of the selectors are kept.\n
+    A selector is a tuple (name, element, attribute, value, parent name), attribute and parent name can be None.\n
+    Markers are tuples (section, text): every match is tagged with the section of the last marker text seen before it.\n
+    """
+    _VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+    def __init__(self, selectors, markers=()):
+        HTMLParser.__init__(self)
+        self._selectors = selectors
+        self._markers = markers
+        self._section = None
+        self._open = []
+        self.matches = []
+
+    @staticmethod
+    def _attr_matches(attrs, attr, value):
+        if attr is None:
+            return True
+        actual = attrs.get(attr)
+        if actual is None:
+            return False
+        # Like BeautifulSoup, a class matches on one of its values or on the complete attribute.
+        return actual == value or (attr == 'class' and value in actual.split())
+
+    def _innermost_open(self, name):
+        for match in reversed(self._open):
+            if match.name == name:
+                return match
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict((key, value if value is not None else u'') for key, value in attrs)
+        void = tag in self._VOID_ELEMENTS
+
+        for match in self._open:
+            if match.element == tag and not void:
+                match.depth += 1
+            if tag == 'a' and 'href' in attrs:
+                match.hrefs.append(attrs['href'])
+
+        for name, element, attr, value, parent_name in self._selectors:
+            if element != tag or not self._attr_matches(attrs, attr, value):
+                continue
+            parent = None
+            if parent_name is not None:
+                parent = self._innermost_open(parent_name)
+                if parent is None:
+                    continue
+            match = _HtmlMatch(name, element, attrs, parent, self._section)
+            if tag == 'a' and 'href' in attrs:
+                match.hrefs.append(attrs['href'])
+            self.matches.append(match)
+            if not void:
+                self._open.append(match)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self._VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for match in list(self._open):
+            if match.element == tag:
+                match.depth -= 1
+                if match.depth == 0:
+                    self._open.remove(match)
+
+    def handle_data(self, data):
+        for match in self._open:
+            match.parts.append(data)
+
+        last_position = -1
+        for section, marker in self._markers:
+            position = data.rfind(marker)
+            if position > last_position:
+                self._section, last_position = section, position
+
+    def handle_entityref(self, name):
+        if name in name2codepoint:
+            self.handle_data(unichr(name2codepoint[name]))
+        else:
+            self.handle_data(u'&%s;' % name)
+
+    def handle_charref(self, name):
+        try:
+            if name[0] in 'xX':
+                self.handle_data(unichr(int(name[1:], 16)))
+            else:
+                self.handle_data(unichr(int(name)))
+        except (ValueError, OverflowError):
+            self.handle_data(u'&#%s;' % name)
+
+    def extract(self, parseable_text):
+        """
+        Run the extractor over a complete html stream.\n
+
+        :param parseable_text: html stream (string)\n
+        :return: Matches grouped by selector name. (Dictionary with selector name as key and a list of _HtmlMatch as value.)\n
+        """
+        self.feed(parseable_text)
+        self.close()
+
+        grouped = dict((selector[0], []) for selector in self._selectors)
+        for match in self.matches:
+            grouped[match.name].append(match)
+        return grouped
+
+
+class _EventIndex(object):
+    """
+    Interval index over the (start, end) dates of _RAW_EVENTS.\n
+    Events are kept sorted on end date and on start date so date filters become bisections, categories and
+    one day/multiple days are stored as a bitmask per event.\n
+    """
+    _ONE_DAY_BIT = 1
+    _MUL_DAY_BIT = 2
+    _DURATION_BITS = _ONE_DAY_BIT | _MUL_DAY_BIT
+    _TEXT_FIELDS = ['Title', 'Loc']
+
+    def __init__(self, events):
+        self.source = events
+
+        firsts, seconds, lasts = self._firsts, self._seconds, self._lasts = _date_bounds(events['Date'])
+        dated = [i for i in range(len(firsts)) if firsts[i]]
+        self._undated = [i for i in range(len(firsts)) if not firsts[i]]
+
+        # Dates are handled as ordinals.
+        self._by_end = array('I', sorted(dated, key=lambda i: lasts[i]))
+        self._ends = array('i', [lasts[i] for i in self._by_end])
+        self._by_start = array('I', sorted(dated, key=lambda i: firsts[i]))
+        self._starts = array('i', [firsts[i] for i in self._by_start])
+        self._max_span = max([lasts[i] - firsts[i] for i in dated]) if dated else None
+
+        self._category_bits = {}
+        for category in events['Cat']:
+            if category not in self._category_bits:
+                self._category_bits[category] = 4 << len(self._category_bits)
+
+        self._bits = [0] * len(firsts)
+        categories = events['Cat']
+        for i in dated:
+            multiple_days = firsts[i] != seconds[i]
+            self._bits[i] = self._category_bits[categories[i]] | (self._MUL_DAY_BIT if multiple_days else self._ONE_DAY_BIT)
+
+        # Inverted index: lower case trigram -> positions of the events containing it, per text field.
+        self._trigrams = {}
+        for field in self._TEXT_FIELDS:
+            postings = self._trigrams[field] = {}
+            for i, text in enumerate(events[field]):
+                for trigram in self._split_trigrams(text.lower()):
+                    postings.setdefault(trigram, set()).add(i)
+
+    @staticmethod
+    def _split_trigrams(text):
+        return set(text[i:i + 3] for i in range(len(text) - 2))
+
+    def search(self, text, field, case_sensitive=True):
+        """
+        Events of which a text field contains a substring.\n
+        Candidates are found with the trigram index and then verified, substrings shorter than 3 characters are verified on all events.\n
+
+        :param text:           Substring to look for. (string)\n
+        :param field:          Field to search in: 'Title' or 'Loc'. (string)\n
+        :param case_sensitive: Exact substring match or case insensitive match. (boolean)\n
+        :return: Positions in _RAW_EVENTS. (set of ints)\n
+        """
+        values = self.source[field]
+        trigrams = self._split_trigrams(text.lower())
+        if trigrams:
+            postings = self._trigrams[field]
+            candidates = None
+            for trigram in sorted(trigrams, key=lambda t: len(postings.get(t, ()))):
+                candidates = set(postings.get(trigram, ())) if candidates is None else candidates & postings.get(trigram, set())
+                if not candidates:
+                    return set()
+        else:
+            candidates = range(len(values))
+
+        if case_sensitive:
+            return set(i for i in candidates if text in values[i])
+        text = text.lower()
+        return set(i for i in candidates if text in values[i].lower())
+
+    def mask(self, categories, one_day, mul_day):
+        """
+        Bitmask selecting events of certain categories and durations.\n
+
+        :param categories: Categories to select. (iterable of strings)\n
+        :param one_day:    Select single day events. (boolean)\n
+        :param mul_day:    Select events spanning multiple days. (boolean)\n
+        :return: Bitmask (int)\n
+        """
+        mask = (self._ONE_DAY_BIT if one_day else 0) | (self._MUL_DAY_BIT if mul_day else 0)
+        for category in categories:
+            mask |= self._category_bits.get(category, 0)
+        return mask
+
+    def matches(self, position, mask):
+        """
+        Check an event against a bitmask created with the mask method: both its category and its duration should be selected.\n
+        """
+        bits = self._bits[position] & mask
+        return bool(bits & self._DURATION_BITS) and bool(bits & ~self._DURATION_BITS)
+
+    def bounds(self, position):
+        """
+        First, second and last date of an event as ordinals, or None if the event has no date.\n
+        """
+        first = self._firsts[position]
+        return (first, self._seconds[position], self._lasts[position]) if first else None
+
+    def ending_before(self, day):
+        return self._by_end[:bisect_left(self._ends, day.toordinal())]
+
+    def ending_on(self, day):
+        day = day.toordinal()
+        return self._by_end[bisect_left(self._ends, day):bisect_right(self._ends, day)]
+
+    def ending_after(self, day):
+        return self._by_end[bisect_right(self._ends, day.toordinal()):]
+
+    def overlapping(self, day):
+        """
+        Events taking place on a certain day.\n
+
+        :param day: Day (datetime.date)\n
+        :return: Positions in _RAW_EVENTS. (list of ints)\n
+        """
+        if self._max_span is None:
+            return []
+        day = day.toordinal()
+        first = bisect_left(self._starts, day - self._max_span)
+        last = bisect_right(self._starts, day)
+        return [i for i in self._by_start[first:last] if self._lasts[i] >= day]
+
+    def undated(self):
+        return self._undated
+
+    def query(self, mask, filter_date, day, one_day_key, mul_day_key, today_key, future_key, past_key):
+        """
+        All events respecting a date filter (see SiouxParser._validate_day) and a category bitmask.\n
+
+        :return: Positions in _RAW_EVENTS, in page order. (list of ints)\n
+        """
+        if not (filter_date[one_day_key] or filter_date[mul_day_key]):
+            return []
+
+        candidates = []
+        if filter_date[past_key]:
+            candidates.extend(self.ending_before(day))
+        if filter_date[today_key]:
+            candidates.extend(self.ending_on(day))
+        if filter_date[future_key]:
+            if filter_date[today_key]:
+                candidates.extend(self.ending_after(day))
+            else:
+                ongoing = set(self.overlapping(day))
+                candidates.extend(i for i in self.ending_after(day) if i not in ongoing)
+
+        return sorted(i for i in candidates if self.matches(i, mask))
+
+
+class _JsonColumnReader(object):
+    """
+    Incremental reader for JSON documents shaped like _RAW_EVENTS/_RAW_BDAYS: an object of arrays.\n
+    The document is read chunk by chunk and every array element is converted as soon as it is complete,
+    so neither the whole text nor an intermediate decoded document is kept in memory.\n
+    """
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, characters):
+        character = self._peek()
+        if character is None or character not in characters:
+            raise ValueError("Expected one of '%s' but found %r" % (characters, character))
+        self._pos += 1
+        return character
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer might continue in the next chunk.
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def read(self, converters=None):
+        """
+        Read the complete document.\n
+
+        :param converters: Functions applied to every element of an array. (Dictionary with key of the array as key and function as value.) (optional)\n
+        :return: Decoded document (dictionary)\n
+        """
+        converters = converters or {}
+        result = {}
+
+        self._expect('{')
+        if self._peek() == '}':
+            return result
+
+        while True:
+            key = self._value()
+            self._expect(':')
+            if self._peek() == '[':
+                self._pos += 1
+                result[key] = list(self._elements(converters.get(key)))
+            else:
+                result[key] = self._value()
+
+            if self._expect(',}') == '}':
+                return result
+
+    def columns(self, converters=None):
+        """
+        Read a document of which every value is an array column by column, the columns are not kept.\n
+        The elements of a column have to be consumed before the next column is read, the rest is skipped otherwise.\n
+
+        :param converters: Functions applied to every element of an array. (Dictionary with key of the array as key and function as value.) (optional)\n
+        :return: Columns (Generator of tuples (key, generator of elements))\n
+        """
+        converters = converters or {}
+
+        self._expect('{')
+        if self._peek() == '}':
+            return
+
+        while True:
+            key = self._value()
+            self._expect(':')
+            self._expect('[')
+            elements = self._elements(converters.get(key))
+            yield key, elements
+            for _ in elements:
+                pass
+
+            if self._expect(',}') == '}':
+                return
+
+    def _elements(self, convert):
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            value = self._value()
+            yield convert(value) if convert is not None else value
+            if self._expect(',]') == ']':
+                return
+
+
+class _MappedArray(object):
+    """
+    Read-only array of 4 byte integers inside a buffer (e.g. a memory map), items are unpacked on access.\n
+    """
+    __slots__ = ('_buffer', '_offset', '_length', '_struct')
+
+    def __init__(self, buf, offset, length, typecode):
+        self._buffer = buf
+        self._offset = offset
+        self._length = length
+        self._struct = struct.Struct('<' + typecode)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError('array index out of range')
+        return self._struct.unpack_from(self._buffer, self._offset + 4 * i)[0]
+
+    def __iter__(self):
+        for i in xrange(self._length):
+            yield self._struct.unpack_from(self._buffer, self._offset + 4 * i)[0]
+
+
+class _StringTable(object):
+    """
+    Interned strings stored as UTF-8 in a buffer, decoded once on first access.\n
+    """
+    def __init__(self, buf, offsets, blob_offset):
+        self._buffer = buf
+        self._offsets = offsets
+        self._blob_offset = blob_offset
+        self._decoded = {}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        try:
+            return self._decoded[i]
+        except KeyError:
+            start = self._blob_offset + self._offsets[i]
+            string = self._decoded[i] = self._buffer[start:self._blob_offset + self._offsets[i + 1]].decode('utf-8')
+            return string
+
+
+class _StringColumn(object):
+    """
+    Column of strings stored as ids into a string table.\n
+    """
+    __slots__ = ('_ids', '_table')
+
+    def __init__(self, ids, table):
+        self._ids = ids
+        self._table = table
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        return self._table[self._ids[i]]
+
+    def __iter__(self):
+        table = self._table
+        for string_id in self._ids:
+            yield table[string_id]
+
+
+class _DateColumn(object):
+    """
+    Column of dates stored as ordinals, 0 is a missing date.\n
+    """
+    __slots__ = ('_ordinals',)
+
+    def __init__(self, ordinals):
+        self._ordinals = ordinals
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __getitem__(self, i):
+        ordinal = self._ordinals[i]
+        return date.fromordinal(ordinal) if ordinal else None
+
+    def __iter__(self):
+        for ordinal in self._ordinals:
+            yield date.fromordinal(ordinal) if ordinal else None
+
+
+class _DateListColumn(object):
+    """
+    Column of date lists stored as one array of ordinals and the offset of every list in it, an empty list is a missing date.\n
+    """
+    __slots__ = ('_offsets', '_ordinals')
+
+    def __init__(self, offsets, ordinals):
+        self._offsets = offsets
+        self._ordinals = ordinals
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        start, end = self._offsets[i], self._offsets[i + 1]
+        if start == end:
+            return None
+        return [date.fromordinal(self._ordinals[j]) for j in xrange(start, end)]
+
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self[i]
+
+    def bounds(self):
+        """
+        First, second and last date of every date list as ordinals (0 for a missing date), without creating dates.\n
+
+        :return: Tuple of three arrays.\n
+        """
+        firsts, seconds, lasts = array('i'), array('i'), array('i')
+        offsets, ordinals = self._offsets, self._ordinals
+        start = offsets[0]
+        for i in xrange(1, len(offsets)):
+            end = offsets[i]
+            if start == end:
+                firsts.append(0)
+                seconds.append(0)
+                lasts.append(0)
+            else:
+                firsts.append(ordinals[start])
+                seconds.append(ordinals[start + 1] if end - start > 1 else ordinals[start])
+                lasts.append(ordinals[end - 1])
+            start = end
+        return firsts, seconds, lasts
+
+
+def _date_bounds(column):
+    """
+    First, second and last date of every date list in a column, as ordinals (0 for a missing date).\n
+
+    :param column: Date lists (list or _DateListColumn)\n
+    :return: Tuple of three arrays.\n
+    """
+    if isinstance(column, _DateListColumn):
+        return column.bounds()
+
+    firsts, seconds, lasts = array('i'), array('i'), array('i')
+    for dates in column:
+        if dates:
+            firsts.append(dates[0].toordinal())
+            seconds.append(dates[1].toordinal() if len(dates) > 1 else firsts[-1])
+            lasts.append(dates[-1].toordinal())
+        else:
+            firsts.append(0)
+            seconds.append(0)
+            lasts.append(0)
+    return firsts, seconds, lasts
+
+
+def _string_column(values):
+    """
+    Store a column of repetitive strings as ids into a table of unique strings.\n
+
+    :param values: Strings (iterable)\n
+    :return: Column (_StringColumn)\n
+    """
+    table = []
+    ids = array('I')
+    string_ids = {}
+    for value in values:
+        if value not in string_ids:
+            string_ids[value] = len(table)
+            table.append(value)
+        ids.append(string_ids[value])
+    return _StringColumn(ids, table)
+
+
+def _date_list_column(values):
+    """
+    Store a column of date lists as arrays of ordinals.\n
+
+    :param values: Date lists or None (iterable)\n
+    :return: Column (_DateListColumn)\n
+    """
+    offsets = array('I', [0])
+    ordinals = array('i')
+    for dates in values:
+        ordinals.extend(d.toordinal() for d in (dates or []))
+        offsets.append(len(ordinals))
+    return _DateListColumn(offsets, ordinals)
+
+
+class BinarySnapshot:
+    """
+    Compact, versioned binary format for _RAW_EVENTS and _RAW_BDAYS.\n
+    Layout (little endian, 4 byte aligned): a header (magic, version, kind, rows, strings), the offsets of the string table,
+    the columns of the kind and finally the UTF-8 string table. Dates are stored as ordinals, strings as ids into the
+    interned string table. Reading memory-maps the file, values are only decoded when accessed.\n
+    """
+    _MAGIC = 'SIOUXSNP'
+    _VERSION = 1
+    _HEADER = struct.Struct('<8sHHII')
+
+    EVENTS = 1
+    BIRTHDAYS = 2
+
+    _STRING = 'string'
+    _DATE = 'date'
+    _DATE_LIST = 'date_list'
+    _SCHEMAS = {
+        EVENTS: [('Date', _DATE_LIST), ('Title', _STRING), ('Loc', _STRING), ('Cat', _STRING), ('Url', _STRING)],
+        BIRTHDAYS: [('Date', _DATE), ('Name', _STRING), ('Role', _STRING), ('RelativeTime', _STRING), ('Url', _STRING)]
+    }
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def write(cls, path, kind, data):
+        """
+        Atomically write events or birthdays to a snapshot file.\n
+
+        :param path: Snapshot file. (string)\n
+        :param kind: BinarySnapshot.EVENTS or BinarySnapshot.BIRTHDAYS\n
+        :param data: Events in _RAW_EVENTS format or birthdays in _RAW_BDAYS format.\n
+        :return: None\n
+        """
+        schema = cls._SCHEMAS[kind]
+        rows = len(data[schema[0][0]])
+        strings = []
+        string_ids = {}
+        columns = []
+
+        for key, column_type in schema:
+            if len(data[key]) != rows:
+                raise RuntimeError("Column '%s' has %d rows instead of %d." % (key, len(data[key]), rows))
+            if column_type == cls._STRING:
+                ids = array('I')
+                for string in data[key]:
+                    if string not in string_ids:
+                        string_ids[string] = len(strings)
+                        strings.append(string)
+                    ids.append(string_ids[string])
+                columns.append(ids)
+            elif column_type == cls._DATE:
+                columns.append(array('i', [d.toordinal() if d is not None else 0 for d in data[key]]))
+            else:
+                offsets = array('I', [0])
+                ordinals = array('i')
+                for dates in data[key]:
+                    ordinals.extend(d.toordinal() for d in (dates or []))
+                    offsets.append(len(ordinals))
+                columns.extend([offsets, ordinals])
+
+        encoded = [string.encode('utf-8') for string in strings]
+        string_offsets = array('I', [0])
+        for string in encoded:
+            string_offsets.append(string_offsets[-1] + len(string))
+
+        for column in [string_offsets] + columns:
+            if sys.byteorder != 'little':
+                column.byteswap()
+
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp_path, 'wb') as fp:
+            fp.write(cls._HEADER.pack(cls._MAGIC, cls._VERSION, kind, rows, len(strings)))
+            for column in [string_offsets] + columns:
+                column.tofile(fp)
+            fp.write(''.join(encoded))
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def read(cls, path, kind):
+        """
+        Memory-map a snapshot file.\n
+
+        :param path: Snapshot file. (string)\n
+        :param kind: BinarySnapshot.EVENTS or BinarySnapshot.BIRTHDAYS\n
+        :return: Events in _RAW_EVENTS format or birthdays in _RAW_BDAYS format, with lazily decoded columns.\n
+        """
+        with open(path, 'rb') as fp:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(buf) < cls._HEADER.size:
+            raise RuntimeError("'%s' is not a snapshot file." % path)
+        magic, version, file_kind, rows, n_strings = cls._HEADER.unpack_from(buf, 0)
+        if magic != cls._MAGIC:
+            raise RuntimeError("'%s' is not a snapshot file." % path)
+        if version != cls._VERSION:
+            raise RuntimeError("Snapshot '%s' has version %d, only version %d is supported." % (path, version, cls._VERSION))
+        if file_kind != kind:
+            raise RuntimeError("Snapshot '%s' contains another kind of data." % path)
+
+        offset = [cls._HEADER.size]
+
+        def take(length, typecode):
+            if offset[0] + 4 * length > len(buf):
+                raise RuntimeError("Snapshot '%s' is truncated." % path)
+            column = _MappedArray(buf, offset[0], length, typecode)
+            offset[0] += 4 * length
+            return column
+
+        string_offsets = take(n_strings + 1, 'I')
+        data = {}
+        string_columns = []
+        for key, column_type in cls._SCHEMAS[kind]:
+            if column_type == cls._STRING:
+                string_columns.append((key, take(rows, 'I')))
+            elif column_type == cls._DATE:
+                data[key] = _DateColumn(take(rows, 'i'))
+            else:
+                offsets = take(rows + 1, 'I')
+                data[key] = _DateListColumn(offsets, take(offsets[rows], 'i'))
+
+        if offset[0] + string_offsets[n_strings] != len(buf):
+            raise RuntimeError("Snapshot '%s' is truncated." % path)
+        table = _StringTable(buf, string_offsets, offset[0])
+        for key, ids in string_columns:
+            data[key] = _StringColumn(ids, table)
+        return data
+
+
+class Event(object):
+    """
+    Event returned by SiouxParser.iter_events. The fields can be read as attributes or, like the dictionaries
+    returned by parse_events, as keys.\n
+    """
+    __slots__ = ('dates', 'title', 'location', 'category', 'url')
+    _KEYS = ('date', 'title', 'location', 'category', 'url')
+
+    def __init__(self, dates, title, location, category, url):
+        self.dates = dates
+        self.title = title
+        self.location = location
+        self.category = category
+        self.url = url
+
+    @property
+    def date(self):
+        """
+        Formatted date, computed when requested.\n
+
+        :return: Date 'dd/mm/yyyy' or 'dd/mm/yyyy - dd/mm/yyyy' for multiple days, None without a date. (string)\n
+        """
+        days = self.dates
+        if not days:
+            return None
+        if len(days) == 2 and days[0] != days[1]:
+            return days[0].strftime('%d/%m/%Y') + " - " + days[1].strftime('%d/%m/%Y')
+        if len(days) == 1 or days[0] == days[1]:
+            return days[0].strftime('%d/%m/%Y')
+        return None
+
+    def keys(self):
+        return list(self._KEYS)
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._KEYS else default
+
+    def as_dict(self):
+        """
+        :return: Event (Dictionary with keys: date, title, location, category, url.)\n
+        """
+        return {'date': self.date, 'title': self.title, 'location': self.location, 'category': self.category, 'url': self.url}
+
+
+class Birthday(object):
+    """
+    Birthday returned by SiouxParser.iter_birthdays. The fields can be read as attributes or, like the dictionaries
+    returned by parse_birthdays, as keys. The age is None when it was not requested.\n
+    """
+    __slots__ = ('day', 'name', 'role', 'relative_time', 'url', 'age')
+
+    def __init__(self, day, name, role, relative_time, url, age=None):
+        self.day = day
+        self.name = name
+        self.role = role
+        self.relative_time = relative_time
+        self.url = url
+        self.age = age
+
+    @property
+    def date(self):
+        """
+        Formatted date, computed when requested.\n
+
+        :return: Date 'dd/mm/yyyy'. (string)\n
+        """
+        return self.day.strftime('%d/%m/%Y')
+
+    def keys(self):
+        keys = ['name', 'date', 'role', 'url']
+        if self.age is not None:
+            keys.append('age')
+        return keys
+
+    def __getitem__(self, key):
+        if key not in ('name', 'date', 'role', 'url') and not (key == 'age' and self.age is not None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        """
+        :return: Birthday (Dictionary with keys: name, date, role, url, [new age].)\n
+        """
+        return dict((key, self[key]) for key in self.keys())
+
+
+class _TransportError(RuntimeError):
+    """
+    Raised when a request keeps failing after all retries or when its deadline passed.\n
+    """
+    pass
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _NullInstrumentation(object):
+    """
+    Instrumentation that records nothing, used when instrumentation is disabled.\n
+    """
+    enabled = False
+    _TIMER = _NullTimer()
+
+    def timer(self, name):
+        return self._TIMER
+
+    def count(self, name, value=1):
+        pass
+
+
+class _Timer(object):
+    __slots__ = ('_instrumentation', '_name', '_start')
+
+    def __init__(self, instrumentation, name):
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._instrumentation.timing(self._name, time.time() - self._start)
+        if exc_type is not None:
+            self._instrumentation.count(self._name + '.errors')
+        return False
+
+
+class Instrumentation(object):
+    """
+    Timers and counters around the stages of SiouxParser, reported to sinks.\n
+    Timers: config, auth (session setup, the NTLM handshake happens in the first http.request), load.events,
+    load.birthdays, http.request, parse.events, parse.birthdays, persons.fetch, query.events, query.birthdays.\n
+    Counters: http.status.<code>, http.bytes, http.retries, http.not_modified, http.fallback, cache.hit, cache.miss,
+    parse.unchanged, blocks.reused.<kind>, rows.parsed.<kind>, rows.filtered.<kind>, persons.fetched, persons.cached.\n
+    A sink has the methods timing(name, seconds) and count(name, value). (see LoggingSink, StatsdSink and MemorySink)\n
+    """
+    enabled = True
+
+    def __init__(self, sinks, profile=False):
+        """
+        :param sinks:   Receivers of the measurements. (list of sinks)\n
+        :param profile: Also capture a cProfile profile of the thread creating this object and, when tracemalloc is
+                        available, memory allocations, until stop_profile is called. (boolean) (default: False)\n
+        """
+        self._sinks = list(sinks)
+        self._profiler = None
+        self._tracemalloc = None
+        if profile:
+            self.start_profile()
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def timing(self, name, seconds):
+        for sink in self._sinks:
+            sink.timing(name, seconds)
+
+    def count(self, name, value=1):
+        for sink in self._sinks:
+            sink.count(name, value)
+
+    def start_profile(self):
+        import cProfile
+
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        try:
+            import tracemalloc
+            tracemalloc.start()
+            self._tracemalloc = tracemalloc
+        except ImportError:
+            self._tracemalloc = None
+
+    def stop_profile(self, limit=20):
+        """
+        Stop the capture.\n
+
+        :param limit: Number of functions and allocation sites in the report. (int) (default: 20)\n
+        :return: Report, the functions with the highest cumulative time and the largest allocation sites. (string)\n
+        """
+        if self._profiler is None:
+            raise RuntimeError('No profile is being captured. Create the instrumentation with profile=True.')
+
+        import pstats
+        import StringIO
+
+        self._profiler.disable()
+        report = StringIO.StringIO()
+        pstats.Stats(self._profiler, stream=report).sort_stats('cumulative').print_stats(limit)
+        self._profiler = None
+
+        if self._tracemalloc is not None:
+            report.write('Largest allocations:\n')
+            for statistic in self._tracemalloc.take_snapshot().statistics('lineno')[:limit]:
+                report.write('%s\n' % statistic)
+            self._tracemalloc.stop()
+            self._tracemalloc = None
+        return report.getvalue()
+
+
+class LoggingSink(object):
+    """
+    Sink writing every measurement to a logger.\n
+    """
+    def __init__(self, logger=None, level=None):
+        import logging
+
+        self._logger = logger if logger is not None else logging.getLogger('SiouxParser')
+        self._level = level if level is not None else logging.INFO
+
+    def timing(self, name, seconds):
+        self._logger.log(self._level, '%s took %.1f ms', name, seconds * 1000)
+
+    def count(self, name, value):
+        self._logger.log(self._level, '%s +%s', name, value)
+
+
+class StatsdSink(object):
+    """
+    Sink sending the measurements to a StatsD server over UDP, timers in milliseconds. Sending never blocks or raises.\n
+    """
+    def __init__(self, host='127.0.0.1', port=8125, prefix='sioux'):
+        self._address = (host, port)
+        self._prefix = prefix + '.' if prefix else ''
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def _send(self, metric):
+        try:
+            self._socket.sendto(metric, self._address)
+        except socket.error:
+            pass
+
+    def timing(self, name, seconds):
+        self._send('%s%s:%d|ms' % (self._prefix, name, int(round(seconds * 1000))))
+
+    def count(self, name, value):
+        self._send('%s%s:%s|c' % (self._prefix, name, value))
+
+
+class MemorySink(object):
+    """
+    Sink keeping the measurements in memory.\n
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def timing(self, name, seconds):
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+
+    def count(self, name, value):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """
+        :return: Per timer its number of calls and total seconds, and all counters. (dictionary)\n
+        """
+        with self._lock:
+            return {'timings': dict((name, {'calls': len(values), 'seconds': sum(values)}) for name, values in self.timings.items()),
+                    'counters': dict(self.counters)}
 
 
 class ConfigInput:
@@ -45,10 +1201,19 @@ class DataInput:
     def intranet(self):
         return 'intranet'
 
+    @property
+    def local_snapshot(self):
+        return 'local_snapshot'
+
+    @property
+    def dynamodb(self):
+        return 'dynamo_db'
+
 
 class SiouxParser:
     _RAW_EVENTS = None
     _RAW_BDAYS = None
+    _EVENT_INDEX = None
 
     # Filter keys for events/bdays
     _ONE_DAY = 'one_day'
@@ -57,20 +1222,79 @@ class SiouxParser:
     _FUTURE = 'future'
     _PAST = 'past'
     _AGE = 'age'
+    _ONGOING = 'ongoing'
 
     # Config file
     _CONFIG_FILE = 'config.ini'
 
-    def __init__(self, config_input, data_input, path_config_file=None, path_json_file=None, dynamo_db_settings=None):
+    # Dynamo DB configuration tables
+    _CONFIG_TABLES = ['URLS', 'EVENTS', 'PARSE_EV', 'PARSE_BDAY', 'P_D']
+
+    # Dynamo DB data tables, written by SiouxParser.publish and read by DataInput.dynamodb:
+    # (table, partition key, sort key), the sort key starts with an ISO date so date ranges are key conditions.
+    # Events are sorted on their last day ('End'), birthdays on their day ('Day').
+    _DATA_TABLES = {'events': ('SIOUX_DATA_EVENTS', 'Cat', 'End'), 'birthdays': ('SIOUX_DATA_BDAYS', 'Role', 'Day')}
+    _DATA_THROUGHPUT = {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10}
+
+    # Local cache of the Dynamo DB configuration
+    _CONFIG_CACHE_FILE = 'sioux_config_cache.json'
+    _CONFIG_CACHE_VERSION = 1
+    _CONFIG_CACHE_TTL = 24 * 60 * 60
+
+    # Local snapshots of the intranet pages
+    _SNAPSHOT_FILE = 'sioux_snapshot_%s.json'
+    _SNAPSHOT_VERSION = 1
+
+    # HTTP transport, can be overridden per parser with the http_settings argument:
+    # timeout:   Timeout of a single request in seconds.
+    # retries:   Number of retries after a connection error, timeout or 5xx response.
+    # backoff:   Delay before the first retry in seconds, doubled for every next retry.
+    # deadline:  Time in seconds after which a request including its retries is given up.
+    # pool_size: Number of connections kept alive per host.
+    _HTTP_SETTINGS = {'timeout': 10, 'retries': 3, 'backoff': 0.5, 'deadline': 30, 'pool_size': 10}
+    _HTTP_RETRY_STATUS = frozenset([500, 502, 503, 504])
+    _HTTP_CHUNK_SIZE = 64 * 1024
+
+    # Cookies the intranet issues after NTLM authentication, only readable by the current user
+    _SESSION_FILE = 'sioux_session.json'
+
+    # Persistent cache of birth dates, birth dates never change
+    _BIRTH_DATE_CACHE_FILE = 'sioux_birth_dates.json'
+    _AGE_WORKERS = 8
+
+    def __init__(self, config_input, data_input, path_config_file=None, path_json_file=None, dynamo_db_settings=None, path_cache_dir=None, http_settings=None,
+                 instrumentation=None):
         """
         Parser for Sioux BE intranet.\n
 
         :param config_input:     Which source is used to get the configuration variables. (property of ConfigInput)\n
         :param data_input:       Which source is used to gather data.(property of DataInput)\n
         :param path_config_file: Path to the configuration file. (default: current directory) (optional)\n
-        :param path_json_file:   Path to the JSON files used. (default: ['sioux_events.json', 'sioux_birthdays.json']) (optional)\n
-        :param dynamo_db_settings: Options for Dynamo DB. (default: ['us-west-2', 'http://localhost:8000']) (optional)\n
+        :param path_json_file:   Path to the JSON (or snapshot) files used. (default: ['sioux_events.json', 'sioux_birthdays.json']) (optional)\n
+        :param dynamo_db_settings: Options for Dynamo DB, used for the configuration and the data tables. (default: ['us-west-2', 'http://localhost:8000']) (optional)\n
+        :param path_cache_dir:   Directory used to cache data between runs. (default: no caching) (optional)\n
+        :param http_settings:    Overrides of _HTTP_SETTINGS. (dictionary) (optional)\n
+        :param instrumentation:  Timers and counters around the stages. (Instrumentation) (default: disabled) (optional)\n
         """
+        self._metrics = _NullInstrumentation()
+        self.set_instrumentation(instrumentation)
+        self._cache_dir = path_cache_dir
+        self._dynamodb = None
+        self._dynamo_db_settings = dynamo_db_settings
+        self._session = None
+        self._session_user = None
+        self._saved_cookies = None
+
+        self._http_settings = dict(self._HTTP_SETTINGS)
+        for key, value in (http_settings or {}).items():
+            if key not in self._HTTP_SETTINGS:
+                raise RuntimeError("Unknown http setting '%s'. Use one of: %s" % (key, ', '.join(sorted(self._HTTP_SETTINGS))))
+            self._http_settings[key] = value
+        self._birth_dates = None
+        self._page_fingerprints = {}
+        self._blocks = {'events': {}, 'birthdays': {}}
+        self._changes = {'events': {}, 'birthdays': {}}
+        self._changes_lock = threading.Lock()
 
         if config_input == ConfigInput.netrc:
             self._get_config = self._get_config_netrc
@@ -80,29 +1304,23 @@ class SiouxParser:
             else:
                 path = os.getcwd()
 
-            self._conf = ConfigParser.ConfigParser()
-            config_file = os.path.join(path, self._CONFIG_FILE)
+            with self._metrics.timer('config'):
+                self._conf = ConfigParser.ConfigParser()
+                config_file = os.path.join(path, self._CONFIG_FILE)
 
-            if os.path.isfile(config_file):
-                self._conf.read(config_file)
-            else:
-                raise RuntimeError("Could not locate config file '%s'." % config_file)
-            self._load_configuration()
+                if os.path.isfile(config_file):
+                    self._conf.read(config_file)
+                else:
+                    raise RuntimeError("Could not locate config file '%s'." % config_file)
+                self._load_configuration()
         elif config_input == ConfigInput.dynamodb:
             self._get_config = self._get_config_dynamo_db
 
             region = dynamo_db_settings[0] if dynamo_db_settings is not None else "us-west-2"
             endpoint = dynamo_db_settings[1] if dynamo_db_settings is not None else "http://localhost:8000"
-            self._dynamodb = boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint)
-
-            self._tables = {
-                'URLS': self._dynamodb.Table('SIOUX_URLS'),
-                'EVENTS': self._dynamodb.Table('SIOUX_EVENTS'),
-                'PARSE_EV': self._dynamodb.Table('SIOUX_PARSE_EV'),
-                'PARSE_BDAY': self._dynamodb.Table('SIOUX_PARSE_BDAY'),
-                'P_D': self._dynamodb.Table('SIOUX_P_D')
-            }
-            self._load_configuration()
+            with self._metrics.timer('config'):
+                self._dynamo_db_config = self._load_config_dynamo_db(region, endpoint)
+                self._load_configuration()
         else:
             raise RuntimeError('Wrong config_input argument! Use property of ConfigInput class')
 
@@ -112,22 +1330,125 @@ class SiouxParser:
 
             self._json_events = path_json_file[0] if path_json_file is not None else 'sioux_events.json'
             self._json_bday = path_json_file[1] if path_json_file is not None else 'sioux_birthdays.json'
+        elif data_input == DataInput.local_snapshot:
+            self._get_events = self._get_events_local_snapshot
+            self._get_recent_birthdays = self._get_recent_birthdays_local_snapshot
+
+            self._snapshot_events = path_json_file[0] if path_json_file is not None else 'sioux_events.snapshot'
+            self._snapshot_bday = path_json_file[1] if path_json_file is not None else 'sioux_birthdays.snapshot'
         elif data_input == DataInput.remote_json:
             self._get_events = self._get_events_remote_json
             self._get_recent_birthdays = self._get_recent_birthdays_remote_json
 
             self._json_events = path_json_file[0] if path_json_file is not None else 'http://'
             self._json_bday = path_json_file[1] if path_json_file is not None else 'http://'
+            self._session = self._create_session()
 
         elif data_input == DataInput.intranet:
             self._get_events = self._get_events_intranet
             self._get_recent_birthdays = self._get_recent_birthdays_intranet
-            locale.setlocale(locale.LC_TIME, "nl_BE")
-            self._session = None
             self.authenticate()
+        elif data_input == DataInput.dynamodb:
+            self._get_events = self._get_events_dynamo_db
+            self._get_recent_birthdays = self._get_recent_birthdays_dynamo_db
         else:
             raise RuntimeError('Wrong data_input argument! Use property of DataInput class')
 
+        self._get_events = self._timed('load.events', self._tracked('events', self._get_events))
+        self._get_recent_birthdays = self._timed('load.birthdays', self._tracked('birthdays', self._get_recent_birthdays))
+
+    def _timed(self, name, function):
+        """
+        Wrap a function in a timer of the instrumentation that is set when the function is called.\n
+        """
+        def timed(*args):
+            with self._metrics.timer(name):
+                return function(*args)
+        return timed
+
+    def _tracked(self, kind, loader):
+        """
+        Wrap a loader so the differences between the data before and after it ran are added to the change feed.\n
+        """
+        def tracked():
+            old = self._RAW_EVENTS if kind == 'events' else self._RAW_BDAYS
+            loader()
+            new = self._RAW_EVENTS if kind == 'events' else self._RAW_BDAYS
+            if old is not None and new is not old:
+                self._record_changes(kind, self._keyed_rows(kind, old), self._keyed_rows(kind, new))
+        return tracked
+
+    def _keyed_rows(self, kind, data):
+        """
+        Rows of loaded data by identity: the url of an event (and its occurrence, an url can repeat), the url, name and
+        role of a birthday.\n
+
+        :return: Rows (Dictionary with key as key and dictionary as value.)\n
+        """
+        rows = {}
+        if kind == 'events':
+            for i in range(len(data['Url'])):
+                key = (data['Url'][i], 0)
+                while key in rows:
+                    key = (key[0], key[1] + 1)
+                rows[key] = self._event_record(data, i).as_dict()
+        else:
+            for i in range(len(data['Url'])):
+                row = Birthday(data['Date'][i], data['Name'][i], data['Role'][i], data['RelativeTime'][i], data['Url'][i]).as_dict()
+                rows[(row['url'], row['name'], row['role'])] = row
+        return rows
+
+    def _record_changes(self, kind, old_rows, new_rows):
+        """
+        Merge the differences between two loads into the change feed. Per key the oldest and the newest row are kept,
+        so several refreshes between two get_changes calls are reported as one change.\n
+        """
+        with self._changes_lock:
+            changes = self._changes[kind]
+            for key in set(old_rows) | set(new_rows):
+                old, new = old_rows.get(key), new_rows.get(key)
+                if old == new:
+                    continue
+                if key in changes:
+                    changes[key][1] = new
+                else:
+                    changes[key] = [old, new]
+
+    def get_changes(self):
+        """
+        Events and birthdays that were added, removed or modified by the refreshes since the previous call.\n
+
+        :return: Changes (Dictionary with keys 'events' and 'birthdays', each a dictionary with keys: added, removed,
+                 modified. Added and removed are lists of dictionaries as returned by parse_events/parse_birthdays,
+                 modified is a list of dictionaries with keys: old, new.)\n
+        """
+        with self._changes_lock:
+            pending, self._changes = self._changes, {'events': {}, 'birthdays': {}}
+
+        result = {}
+        for kind, changes in pending.items():
+            feed = result[kind] = {'added': [], 'removed': [], 'modified': []}
+            for key in sorted(changes):
+                old, new = changes[key]
+                if old == new:
+                    continue
+                if old is None:
+                    feed['added'].append(new)
+                elif new is None:
+                    feed['removed'].append(old)
+                else:
+                    feed['modified'].append({'old': old, 'new': new})
+        return result
+
+    def set_instrumentation(self, instrumentation):
+        """
+        Enable or disable the instrumentation.\n
+
+        :param instrumentation: Timers and counters around the stages, None disables them. (Instrumentation)\n
+        :return: None\n
+        """
+        self._metrics = instrumentation if instrumentation is not None else _NullInstrumentation()
+
     def _get_config_netrc(self, key, value):
         """
         Get configuration value from config file.\n
@@ -138,16 +1459,159 @@ class SiouxParser:
         """
         return self._conf.get(key, value)
 
+    def _has_config(self, key, value):
+        """
+        Check whether an optional configuration value exists, _get_config exits on a missing Dynamo DB value.\n
+
+        :param key:   Key found in configuration value. (string)\n
+        :param value: Value associated with said key. (string)\n
+        :return: True if the configuration value exists. (boolean)\n
+        """
+        if self._get_config == self._get_config_dynamo_db:
+            return value in self._dynamo_db_config.get(key, {})
+        return self._conf.has_option(key, value)
+
+    def _get_dynamodb(self):
+        """
+        Getter for the Dynamo DB resource, created on first use with the dynamo_db_settings of the parser.\n
+
+        :return: Dynamo DB resource (boto3 ServiceResource)\n
+        """
+        if self._dynamodb is None:
+            import boto3
+
+            settings = self._dynamo_db_settings
+            region = settings[0] if settings is not None else "us-west-2"
+            endpoint = settings[1] if settings is not None else "http://localhost:8000"
+            self._dynamodb = boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint)
+        return self._dynamodb
+
     def _get_config_dynamo_db(self, key, value):
+        """
+        Get configuration value from the Dynamo DB configuration loaded by _load_config_dynamo_db.\n
+
+        :param key:   Table in which the configuration value is found. (string)\n
+        :param value: Key of the configuration value in said table. (string)\n
+        :return: Configuration value. (string)\n
+        """
         try:
-            response = self._tables[key].query(KeyConditionExpression=Key('key').eq(value))
-        except botocore.exceptions.ClientError as e:
-            print(e.response['Error']['Message'])
-        else:
-            if len(response['Items']) != 1:
-                print 'Unexpected response: key:%s value:%s %s' % (key, value, response)
-                exit(1)
-            return response['Items'][0]['value']
+            return self._dynamo_db_config[key][value]
+        except KeyError:
+            print 'Unexpected response: key:%s value:%s (not found in SIOUX_%s)' % (key, value, key)
+            exit(1)
+
+    def _scan_config_table(self, key):
+        """
+        Read a whole Dynamo DB configuration table with as few requests as possible.\n
+        While tools/SiouxConvertDynamoDB.py replaces a value, the old and the new entry of a key both exist for a moment:
+        the entry with the newest 'updated' attribute (milliseconds since the epoch, missing is oldest) is used.\n
+
+        :param key: Table to read. (string)\n
+        :return: Configuration values of this table. (Dictionary with config key as key and config value as value.)\n
+        """
+        config = {}
+        updated = {}
+        scan_kwargs = {}
+
+        while True:
+            response = self._tables[key].scan(**scan_kwargs)
+            for item in response['Items']:
+                item_updated = item.get('updated', 0)
+                if item['key'] in config:
+                    if item_updated == updated[item['key']]:
+                        print 'Unexpected response: key:%s value:%s (duplicate entry)' % (key, item['key'])
+                        exit(1)
+                    if item_updated < updated[item['key']]:
+                        continue
+                config[item['key']] = item['value']
+                updated[item['key']] = item_updated
+
+            if 'LastEvaluatedKey' not in response:
+                return config
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _load_config_dynamo_db(self, region, endpoint):
+        """
+        Load the complete configuration from Dynamo DB, one scan per table.\n
+        When a cache directory is set, a local copy is used as long as it is younger than _CONFIG_CACHE_TTL, without
+        importing boto3 or creating the Dynamo DB resource. The copy is only written when all tables could be read.\n
+
+        :param region:   Dynamo DB region. (string)\n
+        :param endpoint: Dynamo DB endpoint. (string)\n
+        :return: Configuration. (Dictionary with table as key and a dictionary of config values as value.)\n
+        """
+        cached = self._read_cache(self._CONFIG_CACHE_FILE)
+        if cached is not None and cached.get('version') == self._CONFIG_CACHE_VERSION \
+                and cached.get('source') == [region, endpoint] \
+                and 0 <= time.time() - cached.get('timestamp', 0) < self._CONFIG_CACHE_TTL:
+            return cached['config']
+
+        import botocore.exceptions
+
+        self._tables = dict((key, self._get_dynamodb().Table('SIOUX_' + key)) for key in self._CONFIG_TABLES)
+
+        config = {}
+        complete = True
+        for key in self._CONFIG_TABLES:
+            try:
+                config[key] = self._scan_config_table(key)
+            except botocore.exceptions.ClientError as e:
+                print(e.response['Error']['Message'])
+                config[key] = {}
+                complete = False
+
+        # A failed table (throttling, a network or permission error) may be readable on the next run, never cache it.
+        if complete:
+            self._write_cache(self._CONFIG_CACHE_FILE, {'version': self._CONFIG_CACHE_VERSION, 'source': [region, endpoint],
+                                                        'timestamp': time.time(), 'config': config})
+        return config
+
+    def _read_cache(self, name, private=False):
+        """
+        Read a JSON file from the cache directory.\n
+
+        :param name:    Filename in the cache directory. (string)\n
+        :param private: Ignore the file when other users can access it. (boolean) (default: False)\n
+        :return: Cached content or None if caching is disabled or the file is missing/corrupt.\n
+        """
+        if self._cache_dir is None:
+            return None
+
+        try:
+            path = os.path.join(self._cache_dir, name)
+            if private and os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                return None
+            with open(path, 'r') as fp:
+                content = json.load(fp)
+        except (IOError, OSError, ValueError):
+            self._metrics.count('cache.miss')
+            return None
+        self._metrics.count('cache.hit')
+        return content
+
+    def _write_cache(self, name, content, private=False):
+        """
+        Atomically write a JSON file to the cache directory. Nothing happens if caching is disabled.\n
+
+        :param name:    Filename in the cache directory. (string)\n
+        :param content: JSON serializable content.\n
+        :param private: Only the current user can read the file. (boolean) (default: False)\n
+        :return: None\n
+        """
+        if self._cache_dir is None:
+            return
+
+        path = os.path.join(self._cache_dir, name)
+        tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(), threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self._cache_dir):
+                os.makedirs(self._cache_dir)
+            with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0600 if private else 0666), 'w') as fp:
+                json.dump(content, fp, separators=(',', ':'), default=_json_default)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def _load_configuration(self):
 
@@ -188,7 +1652,7 @@ class SiouxParser:
         self._bday_child = self._get_config('PARSE_BDAY', 'ROLE_COLLEGUE_CHILD')
         self._bday_partner = self._get_config('PARSE_BDAY', 'ROLE_COLLEGUE_PARTNER')
 
-        self._p_d_tab = self._get_config('P_D', 'TAB'),
+        self._p_d_tab = self._get_config('P_D', 'TAB')
         self._p_d_tab_arg = self._get_config('P_D', 'TAB_ARG')
         self._p_d_tab_value = self._get_config('P_D', 'TAB_VALUE')
         self._p_d_rec_element = self._get_config('P_D', 'REC_ELEMENT')
@@ -198,6 +1662,16 @@ class SiouxParser:
         self._p_d_date_arg = self._get_config('P_D', 'DATE_ARG')
         self._p_d_date_value = self._get_config('P_D', 'DATE_VALUE')
 
+        # Selectors for _HtmlExtractor, compiled once:
+        self._ev_selectors = [(name, self._ev_parse_element.lower(), self._ev_parse_arg, value, None) for name, value in
+                              [('date', self._ev_value_date), ('title', self._ev_value_title),
+                               ('location', self._ev_value_location), ('category', self._ev_value_category)]]
+        self._bday_selectors = [('overall', self._bday_parse_element.lower(), self._bday_parse_arg, self._bday_parse_overall, None),
+                                ('entry', self._bday_parse_separate.lower(), None, None, 'overall')]
+        self._p_d_selectors = [('tab', self._p_d_tab.lower(), self._p_d_tab_arg, self._p_d_tab_value, None),
+                               ('rec', self._p_d_rec_element.lower(), self._p_d_rec_arg, self._p_d_rec_value, 'tab'),
+                               ('date', self._p_d_date_element.lower(), self._p_d_date_arg, self._p_d_date_value, 'rec')]
+
     @property
     def _curr_date(self):
         return datetime.now().date()
@@ -217,26 +1691,159 @@ class SiouxParser:
     @staticmethod
     def _prettify_string(string):
         """
-        Remove tabs, newlines and leading/trailing spaces.\n
+        Remove tabs, newlines and leading/trailing spaces.\n
+
+        :param string: String containing clutter.\n
+        :return: Prettified string. (string)\n
+        """
+        return string.strip().replace('\n', '').replace('\t', '')
+
+    @staticmethod
+    def _parse_event_date(string):
+        """
+        Parse a string to find all event dates.\n
+
+        :param string: Human readable date.\n
+        :return: Dates (List of datetime.date)\n
+        """
+        return DateParser.event_dates(string)
+
+    def _request(self, url, headers=None, stream=False, deadline=None):
+        """
+        Perform an authenticated GET request.\n
+
+        :param url:      url to get.\n
+        :param headers:  Extra request headers. (dictionary) (optional)\n
+        :param stream:   Do not download the body before returning. (boolean) (default: False)\n
+        :param deadline: Time (time.time()) at which the request is given up. (float) (default: now + the deadline setting)\n
+        :return: Response (requests.Response)\n
+        """
+        if self._session is None:
+            raise RuntimeError('Not authenticated yet. Call authenticate method before getting birthdays!')
+
+        import requests
+
+        settings = self._http_settings
+        if deadline is None:
+            deadline = time.time() + settings['deadline']
+        attempt = 0
+
+        while True:
+            error = None
+            try:
+                with self._metrics.timer('http.request'):
+                    req = self._session.get(url, headers=headers, stream=stream, timeout=max(0.001, min(settings['timeout'], deadline - time.time())))
+                self._metrics.count('http.status.%d' % req.status_code)
+                if req.status_code not in self._HTTP_RETRY_STATUS:
+                    break
+                error = 'status %d' % req.status_code
+                # Give the connection of a (streamed) response back to the pool before retrying.
+                req.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            delay = settings['backoff'] * (2 ** attempt)
+            attempt += 1
+            self._metrics.count('http.retries')
+            if attempt > settings['retries'] or time.time() + delay >= deadline:
+                raise _TransportError("Request to '%s' failed after %d attempt(s): %s" % (url, attempt, error))
+            time.sleep(delay)
+
+        if req.status_code == 401 and self._saved_cookies:
+            # Stored cookies were rejected, start over with a fresh NTLM handshake.
+            req.close()
+            self._session.cookies.clear()
+            self._saved_cookies = None
+            return self._request(url, headers, stream, deadline)
+
+        if not req.ok:
+            req.close()
+            raise RuntimeError("Bad response!")
+        self._store_session_cookies()
+        return req
+
+    def _iter_text(self, req, deadline=None):
+        """
+        Iterate over the (decompressed) body of a streamed response as text.\n
+        A body that breaks off, stalls or is still being read at the deadline raises _TransportError.\n
+
+        :param req:      Streamed response. (requests.Response)\n
+        :param deadline: Time (time.time()) at which reading is given up. (float) (optional)\n
+        :return: Text chunks (generator of strings)\n
+        """
+        import requests
+
+        decoder = codecs.getincrementaldecoder(req.encoding or 'utf-8')(errors='replace')
+        chunks = req.iter_content(self._HTTP_CHUNK_SIZE)
+        while True:
+            if deadline is not None and time.time() >= deadline:
+                raise _TransportError("Reading '%s' passed its deadline." % req.url)
+            try:
+                chunk = next(chunks, None)
+            except requests.RequestException as e:
+                raise _TransportError("Reading '%s' failed: %s" % (req.url, e))
+            if chunk is None:
+                break
+            self._metrics.count('http.bytes', len(chunk))
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
+    def _create_session(self):
+        """
+        Create a session with connection pools sized for concurrent requests, connections are kept alive between requests
+        and responses are compressed.\n
+        Retries are done by _request, so they can respect the deadline.\n
+
+        :return: Session (requests.Session)\n
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        pool_size = self._http_settings['pool_size']
+        for prefix in ['http://', 'https://']:
+            session.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0))
+        return session
+
+    @staticmethod
+    def _cookie_list(cookies):
+        return sorted([{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires, 'secure': c.secure}
+                       for c in cookies if not c.is_expired()], key=lambda c: (c['domain'], c['path'], c['name']))
+
+    def _restore_session_cookies(self):
+        """
+        Load the cookies of a previous run into the session, so the NTLM handshake can be skipped while they are valid.\n
 
-        :param string: String containing clutter.\n
-        :return: Prettified string. (string)\n
+        :return: None\n
         """
-        return string.strip().replace('\n', '').replace('\t', '')
+        stored = self._read_cache(self._SESSION_FILE, private=True)
+        if stored is None or stored.get('user') != self._session_user:
+            return
 
-    @staticmethod
-    def _parse_event_date(string):
+        for cookie in stored['cookies']:
+            if cookie['expires'] is None or cookie['expires'] > time.time():
+                self._session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+                                          expires=cookie['expires'], secure=cookie['secure'])
+        self._saved_cookies = self._cookie_list(self._session.cookies)
+
+    def _store_session_cookies(self):
         """
-        Parse a string to find all event dates.\n
+        Persist the session cookies when they changed.\n
 
-        :param string: Human readable date.\n
-        :return: Dates (List of datetime.date)\n
+        :return: None\n
         """
-        m = re.findall("\d\d +[a-z]+ '\d\d", string)
-        if m:
-            return [datetime.strptime(dateString, "%d %b '%y").date() for dateString in m]
-        else:
-            return None
+        if self._cache_dir is None or self._session_user is None:
+            return
+
+        cookies = self._cookie_list(self._session.cookies)
+        if cookies != self._saved_cookies:
+            self._saved_cookies = cookies
+            self._write_cache(self._SESSION_FILE, {'user': self._session_user, 'cookies': cookies}, private=True)
 
     def _fetch_data(self, url):
         """
@@ -245,32 +1852,123 @@ class SiouxParser:
         :param url: url to get html from.\n
         :return: html stream (string)\n
         """
-        if self._session is None:
-            raise RuntimeError('Not authenticated yet. Call authenticate method before getting birthdays!')
+        return self._request(url).text
 
-        req = self._session.get(url)
-        if not req.ok:
-            raise RuntimeError("Bad response!")
-        return req.text
+    def _fetch_parsed(self, url, parse, restore, stream=False, kind='data', resident=False):
+        """
+        Get parsed data from a certain URL, using the snapshot in the cache directory when the page did not change.\n
+        The snapshot is revalidated with If-None-Match/If-Modified-Since, on a 304 nothing is downloaded or parsed.\n
+        When the request or the streamed body fails after all retries or its deadline, the last good snapshot is returned.\n
+        With resident data, None is returned instead when that data is still current: on a 304, when the page has the
+        same fingerprint as when it was parsed last or when the request fails.\n
+
+        :param url:     url to get html from.\n
+        :param parse:   Function converting the html stream into the parsed structure.\n
+        :param restore: Function converting the JSON snapshot back into the parsed structure.\n
+        :param stream:  Pass the body to parse as an iterator of text chunks instead of one string. (boolean) (default: False)\n
+        :param kind:    Name of the data in the instrumentation. (string) (default: 'data')\n
+        :param resident: The data of this URL is loaded already. (boolean) (default: False)\n
+        :return: Parsed structure, or None when the resident data is still current.\n
+        """
+        snapshot_file = self._SNAPSHOT_FILE % hashlib.sha1(url.encode('utf-8')).hexdigest()
+        snapshot = self._read_cache(snapshot_file)
+        if snapshot is not None and (snapshot.get('version') != self._SNAPSHOT_VERSION or snapshot.get('url') != url):
+            snapshot = None
+
+        headers = {}
+        if snapshot is not None:
+            if snapshot.get('etag'):
+                headers['If-None-Match'] = snapshot['etag']
+            if snapshot.get('last_modified'):
+                headers['If-Modified-Since'] = snapshot['last_modified']
+
+        deadline = time.time() + self._http_settings['deadline']
+        try:
+            req = self._request(url, headers, stream, deadline)
+            try:
+                if req.status_code == 304 and headers:
+                    self._metrics.count('http.not_modified')
+                    return restore(snapshot['data']) if not resident else None
+
+                with self._metrics.timer('parse.' + kind):
+                    if stream:
+                        # The body is read while parsing, so it can still fail or pass the deadline here.
+                        data = parse(self._iter_text(req, deadline))
+                    else:
+                        text = req.text
+                        self._metrics.count('http.bytes', len(req.content))
+                        fingerprint = hashlib.sha1(text.encode('utf-8')).hexdigest()
+                        if resident and self._page_fingerprints.get(url) == fingerprint:
+                            self._metrics.count('parse.unchanged')
+                            return None
+                        data = parse(text)
+                        self._page_fingerprints[url] = fingerprint
+            finally:
+                req.close()
+        except _TransportError:
+            # The intranet is unreachable or too slow, fall back to the last good data.
+            if snapshot is None and not resident:
+                raise
+            self._metrics.count('http.fallback')
+            return restore(snapshot['data']) if not resident else None
+        if self._metrics.enabled and data:
+            self._metrics.count('rows.parsed.' + kind, len(data.values()[0]))
+
+        self._write_cache(snapshot_file, {'version': self._SNAPSHOT_VERSION, 'url': url, 'etag': req.headers.get('ETag'),
+                                          'last_modified': req.headers.get('Last-Modified'), 'data': data})
+        return data
+
+    @staticmethod
+    def _fix_events_json(json_dump):
+        """
+        Convert the dates of JSON formatted events back to datetime.date.\n
 
-    def _fix_events_json(self, json_dump):
+        :param json_dump: Events as stored in _RAW_EVENTS with ISO formatted dates.\n
+        :return: Events in _RAW_EVENTS format.\n
+        """
         i = 0
         for dates in json_dump['Date']:
             j = 0
-            for date in dates:
-                json_dump['Date'][i][j] = datetime.strptime(date, "%Y-%m-%d").date()
+            for date_string in dates or []:
+                json_dump['Date'][i][j] = DateParser.iso(date_string)
                 j = j + 1
             i = i + 1
 
-        self._RAW_EVENTS = json_dump
+        return json_dump
+
+    @staticmethod
+    def _events_columns(events):
+        """
+        Store events in columns: dates as arrays of ordinals, repetitive strings interned.\n
+
+        :param events: Events in _RAW_EVENTS format with lists as columns.\n
+        :return: Events in _RAW_EVENTS format.\n
+        """
+        return {'Date': _date_list_column(events['Date']), 'Title': events['Title'], 'Loc': _string_column(events['Loc']),
+                'Cat': _string_column(events['Cat']), 'Url': events['Url']}
 
     def _get_events_local_json(self):
         with open(self._json_events, 'r') as fp:
-            self._fix_events_json(json.load(fp))
+            self._RAW_EVENTS = self._events_columns(self._fix_events_json(json.load(fp)))
+
+    def _get_events_local_snapshot(self):
+        self._RAW_EVENTS = BinarySnapshot.read(self._snapshot_events, BinarySnapshot.EVENTS)
 
     def _get_events_remote_json(self):
-        response = urllib.urlopen(self._json_events)
-        self._fix_events_json(json.loads(response.read()))
+        data = self._fetch_parsed(self._json_events, self._read_events_json, self._fix_events_json, stream=True, kind='events',
+                                  resident=self._RAW_EVENTS is not None)
+        if data is not None:
+            self._RAW_EVENTS = self._events_columns(data)
+
+    @staticmethod
+    def _read_events_json(chunks):
+        """
+        Decode a JSON stream of events, converting the dates while reading.\n
+
+        :param chunks: JSON text in chunks. (iterator of strings)\n
+        :return: Events in _RAW_EVENTS format.\n
+        """
+        return _JsonColumnReader(chunks).read({'Date': lambda dates: [DateParser.iso(d) for d in dates] if dates is not None else None})
 
     def _get_events_intranet(self):
         """
@@ -278,7 +1976,58 @@ class SiouxParser:
 
         :return: None\n
         """
-        parseable_text = self._fetch_data(self._eventsOverviewUrl)
+        data = self._fetch_parsed(self._eventsOverviewUrl, self._parse_events_html, self._fix_events_json, kind='events',
+                                  resident=self._RAW_EVENTS is not None)
+        if data is not None:
+            self._RAW_EVENTS = self._events_columns(data)
+
+    def _parse_events_html(self, parseable_text):
+        """
+        Parse the html of the events page.\n
+
+        :param parseable_text: html stream of the events page. (string)\n
+        :return: Events in _RAW_EVENTS format.\n
+        """
+        try:
+            fields = _HtmlExtractor(self._ev_selectors).extract(parseable_text)
+        except HTMLParseError:
+            return self._parse_events_soup(parseable_text)
+
+        counts = set(len(matches) for matches in fields.values())
+        if len(counts) != 1 or not all(title.hrefs for title in fields['title']):
+            return self._parse_events_soup(parseable_text)
+
+        dict_events = {"Date": [], "Title": [], "Loc": [], "Cat": [], "Url": []}
+
+        # An event block is identified by its raw texts, blocks that did not change since the previous parse are reused.
+        previous, blocks = self._blocks['events'], {}
+        for dateEv, titleEv, locEv, catEv in zip(fields['date'], fields['title'], fields['location'], fields['category']):
+            block = (dateEv.text, titleEv.text, locEv.text, catEv.text, titleEv.hrefs[0])
+            row = blocks.get(block) or previous.get(block)
+            if row is None:
+                row = (self._parse_event_date(block[0]), self._prettify_string(block[1]), self._prettify_string(block[2]),
+                       self._prettify_string(block[3]), self._base_url + block[4])
+            blocks[block] = row
+
+            dict_events['Date'].append(row[0])
+            dict_events['Title'].append(row[1])
+            dict_events['Loc'].append(row[2])
+            dict_events['Cat'].append(row[3])
+            dict_events['Url'].append(row[4])
+
+        if self._metrics.enabled:
+            self._metrics.count('blocks.reused.events', sum(1 for block in blocks if block in previous))
+        self._blocks['events'] = blocks
+        return dict_events
+
+    def _parse_events_soup(self, parseable_text):
+        """
+        Parse the html of the events page with a complete BeautifulSoup tree. Fallback of _parse_events_html.\n
+
+        :param parseable_text: html stream of the events page. (string)\n
+        :return: Events in _RAW_EVENTS format.\n
+        """
+        from bs4 import BeautifulSoup
 
         soup = BeautifulSoup(parseable_text, "html.parser")
 
@@ -296,23 +2045,56 @@ class SiouxParser:
             dict_events['Cat'].append(catEv)
             dict_events['Url'].append(self._base_url + titleEv.find('a', href=True)['href'])
 
-        self._RAW_EVENTS = dict_events
+        return dict_events
+
+    @staticmethod
+    def _fix_birthdays_json(json_dump):
+        """
+        Convert the dates of JSON formatted birthdays back to datetime.date.\n
 
-    def _fix_birthdays_json(self, json_dump):
+        :param json_dump: Birthdays as stored in _RAW_BDAYS with ISO formatted dates.\n
+        :return: Birthdays in _RAW_BDAYS format.\n
+        """
         i = 0
-        for date in json_dump['Date']:
-            json_dump['Date'][i] = datetime.strptime(date, "%Y-%m-%d").date()
+        for date_string in json_dump['Date']:
+            json_dump['Date'][i] = DateParser.iso(date_string)
             i = i + 1
 
-        self._RAW_BDAYS = json_dump
+        return json_dump
+
+    @staticmethod
+    def _birthdays_columns(bdays):
+        """
+        Store birthdays in columns: dates as an array of ordinals, repetitive strings interned.\n
+
+        :param bdays: Birthdays in _RAW_BDAYS format with lists as columns.\n
+        :return: Birthdays in _RAW_BDAYS format.\n
+        """
+        return {'Date': _DateColumn(array('i', [d.toordinal() if d else 0 for d in bdays['Date']])), 'Name': bdays['Name'],
+                'Role': _string_column(bdays['Role']), 'RelativeTime': _string_column(bdays['RelativeTime']), 'Url': bdays['Url']}
 
     def _get_recent_birthdays_local_json(self):
         with open(self._json_bday, 'r') as fp:
-            self._fix_birthdays_json(json.load(fp))
+            self._RAW_BDAYS = self._birthdays_columns(self._fix_birthdays_json(json.load(fp)))
+
+    def _get_recent_birthdays_local_snapshot(self):
+        self._RAW_BDAYS = BinarySnapshot.read(self._snapshot_bday, BinarySnapshot.BIRTHDAYS)
 
     def _get_recent_birthdays_remote_json(self):
-        response = urllib.urlopen(self._json_bday)
-        self._fix_birthdays_json(json.loads(response.read()))
+        data = self._fetch_parsed(self._json_bday, self._read_birthdays_json, self._fix_birthdays_json, stream=True, kind='birthdays',
+                                  resident=self._RAW_BDAYS is not None)
+        if data is not None:
+            self._RAW_BDAYS = self._birthdays_columns(data)
+
+    @staticmethod
+    def _read_birthdays_json(chunks):
+        """
+        Decode a JSON stream of birthdays, converting the dates while reading.\n
+
+        :param chunks: JSON text in chunks. (iterator of strings)\n
+        :return: Birthdays in _RAW_BDAYS format.\n
+        """
+        return _JsonColumnReader(chunks).read({'Date': DateParser.iso})
 
     def _get_recent_birthdays_intranet(self):
         """
@@ -320,53 +2102,152 @@ class SiouxParser:
 
         :return: None\n
         """
-        parseable_text = self._fetch_data(self._birtdayUrl)
+        data = self._fetch_parsed(self._birtdayUrl, self._parse_birthdays_html, self._fix_birthdays_json, kind='birthdays',
+                                  resident=self._RAW_BDAYS is not None)
+        if data is not None:
+            self._RAW_BDAYS = self._birthdays_columns(data)
 
-        soup = BeautifulSoup(parseable_text, "html.parser")
+    def _parse_birthdays_html(self, parseable_text):
+        """
+        Parse the html of the birthday page.\n
+
+        :param parseable_text: html stream of the birthday page. (string)\n
+        :return: Birthdays in _RAW_BDAYS format.\n
+        """
+        markers = [(self._TODAY, self._bday_today), (self._FUTURE, self._bday_future), (self._PAST, self._bday_past)]
+        try:
+            fields = _HtmlExtractor(self._bday_selectors, markers).extract(parseable_text)
+        except HTMLParseError:
+            fields = None
+
+        if fields and fields['overall']:
+            overall = fields['overall'][0]
+            entries = [(entry.text, entry.attrs.get('class', u'').split(), entry.attrs.get('href'), entry.section) for entry in fields['entry'] if entry.parent is overall]
+        else:
+            entries = self._parse_birthdays_soup(parseable_text, markers)
 
         dict_bday = {'Name': [], 'Date': [], 'Role': [], 'RelativeTime': [], 'Url': []}
 
-        bday = soup.find_all(self._bday_parse_element, {self._bday_parse_arg: self._bday_parse_overall})
-        bdaylist = bday[0].findAll(self._bday_parse_separate)
-        curr_year = self._curr_year
-        curr_date = datetime(curr_year, self._curr_month, self._curr_day).date()
-
-        position_today = parseable_text.find(self._bday_today)
-        position_future = parseable_text.find(self._bday_future)
-        position_past = parseable_text.find(self._bday_past)
-
-        for entry in bdaylist:
-            position_entry = parseable_text.find(entry.text)
-            if position_today < position_entry < position_future:
-                dict_bday['RelativeTime'].append(self._TODAY)
-            elif position_future < position_entry < position_past:
-                dict_bday['RelativeTime'].append(self._FUTURE)
-            elif position_past < position_entry:
-                dict_bday['RelativeTime'].append(self._PAST)
-            else:
+        curr_date = self._curr_date
+
+        # A birthday block is identified by its raw entry and today's date, blocks that did not change since the
+        # previous parse are reused.
+        previous, blocks = self._blocks['birthdays'], {}
+        for entry_text, entry_class, entry_href, section in entries:
+            if section is None:
                 raise RuntimeError(' Parsing bday day failed.')
 
-            name = re.findall("(.+) \(", entry.text)[0]
-            role = entry['class'][0]
+            block = (entry_text, entry_class[0], entry_href, section, curr_date)
+            row = blocks.get(block) or previous.get(block)
+            if row is None:
+                name = re.findall("(.+) \(", entry_text)[0]
 
-            if dict_bday['RelativeTime'][-1] == self._TODAY:
-                dict_bday['Date'].append(curr_date)
-            else:
-                # Some browsers retrieve (Nov 16), (May 16), ... instead of (16 Nov), (Mei 16), ...
-                regex_date = re.findall("\(.+\)", entry.text)[0].replace('(', '').replace(')', '')
-                if regex_date[0].isdigit():  # If we have a date that starts with a digit, we have a dutch date
-                    date = datetime.strptime(regex_date, "%d %b").date().replace(year=curr_year)
+                if section == self._TODAY:
+                    day = curr_date
                 else:
-                    locale.setlocale(locale.LC_TIME, 'en_US')
-                    date = datetime.strptime(regex_date, "%b %d").date().replace(year=curr_year)
-                    locale.setlocale(locale.LC_TIME, 'nl_BE')
-                dict_bday['Date'].append(date)
+                    # Some browsers retrieve (Nov 16), (May 16), ... instead of (16 Nov), (Mei 16), ...
+                    regex_date = re.findall("\(.+\)", entry_text)[0].replace('(', '').replace(')', '')
+                    day = DateParser.day_month(regex_date, curr_date.year)
+                    # The page shows no year: around New Year a recent birthday lies in the previous year and an
+                    # upcoming birthday in the next year.
+                    if section == self._PAST and day > curr_date:
+                        day = DateParser.day_month(regex_date, curr_date.year - 1)
+                    elif section == self._FUTURE and day < curr_date:
+                        day = DateParser.day_month(regex_date, curr_date.year + 1)
+                row = (name, day, entry_class[0], section, self._base_url + entry_href)
+            blocks[block] = row
+
+            dict_bday['Name'].append(row[0])
+            dict_bday['Date'].append(row[1])
+            dict_bday['Role'].append(row[2])
+            dict_bday['RelativeTime'].append(row[3])
+            dict_bday['Url'].append(row[4])
+
+        if self._metrics.enabled:
+            self._metrics.count('blocks.reused.birthdays', sum(1 for block in blocks if block in previous))
+        self._blocks['birthdays'] = blocks
+        return dict_bday
+
+    def _parse_birthdays_soup(self, parseable_text, markers):
+        """
+        Find the birthday entries with a complete BeautifulSoup tree. Fallback of _parse_birthdays_html.\n
+
+        :param parseable_text: html stream of the birthday page. (string)\n
+        :param markers:        Section titles. (List of tuples (section, title))\n
+        :return: Entries (List of tuples (text, classes, href, section))\n
+        """
+        from bs4 import BeautifulSoup, NavigableString
+
+        soup = BeautifulSoup(parseable_text, "html.parser")
+        bday = soup.find_all(self._bday_parse_element, {self._bday_parse_arg: self._bday_parse_overall})
+        bdaylist = set(id(entry) for entry in bday[0].findAll(self._bday_parse_separate))
+
+        entries = []
+        section = None
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                last_position = -1
+                for marker_section, marker in markers:
+                    position = node.rfind(marker)
+                    if position > last_position:
+                        section, last_position = marker_section, position
+            elif id(node) in bdaylist:
+                entries.append((node.text, node.get('class', []), node.get('href'), section))
+        return entries
+
+    def _get_persons_birth_date(self, url):
+        """
+        Get birth date of a person given the persons url.\n
+
+        :param url: Url of the persons page. (string)\n
+        :return: Birth date (datetime.date)\n
+        """
+        parseable_text = self._fetch_data(url)
+
+        try:
+            fields = _HtmlExtractor(self._p_d_selectors).extract(parseable_text)
+            tab = fields['tab'][0]
+            rec = [rec for rec in fields['rec'] if rec.parent is tab][0]
+            birth_date = [birth_date for birth_date in fields['date'] if birth_date.parent is rec][0].text
+        except (HTMLParseError, IndexError):
+            from bs4 import BeautifulSoup
+
+            soup = BeautifulSoup(parseable_text, "html.parser")
+
+            tab = soup.find(self._p_d_tab, {self._p_d_tab_arg: self._p_d_tab_value})
+            rec = tab.find(self._p_d_rec_element, {self._p_d_rec_arg: self._p_d_rec_value})
+            birth_date = rec.find(self._p_d_date_element, {self._p_d_date_arg: self._p_d_date_value}).text
+        return DateParser.dmy(birth_date)
+
+    def _get_birth_dates(self, urls):
+        """
+        Get birth dates of multiple persons. Persons missing in the birth date cache are fetched concurrently.\n
+
+        :param urls: Urls of the persons pages. (list of strings)\n
+        :return: Birth dates (Dictionary with url as key and datetime.date as value.)\n
+        """
+        if self._birth_dates is None:
+            cached = self._read_cache(self._BIRTH_DATE_CACHE_FILE) or {}
+            self._birth_dates = dict((url, DateParser.iso(birth_date)) for url, birth_date in cached.items())
+
+        missing = list(set(url for url in urls if url not in self._birth_dates))
+        self._metrics.count('persons.cached', len(urls) - len(missing))
+        if missing:
+            from multiprocessing.pool import ThreadPool
 
-            dict_bday['Url'].append(self._base_url + entry.get('href'))
-            dict_bday['Name'].append(name)
-            dict_bday['Role'].append(role)
+            self._metrics.count('persons.fetched', len(missing))
+            pool = ThreadPool(min(self._AGE_WORKERS, len(missing)))
+            try:
+                with self._metrics.timer('persons.fetch'):
+                    birth_dates = pool.map(self._get_persons_birth_date, missing)
+            finally:
+                pool.close()
+                pool.join()
 
-        self._RAW_BDAYS = dict_bday
+            self._birth_dates.update(zip(missing, birth_dates))
+            self._write_cache(self._BIRTH_DATE_CACHE_FILE, self._birth_dates)
+
+        return dict((url, self._birth_dates[url]) for url in urls)
 
     def _get_persons_age(self, url):
         """
@@ -374,19 +2255,178 @@ class SiouxParser:
 
         :return: Age\n
         """
-        parseable_text = self._fetch_data(url)
+        curr_date = self._curr_date
+        dt = self._get_birth_dates([url])[url]
+
+        # noinspection PyTypeChecker
+        return curr_date.year - dt.year - ((curr_date.month, curr_date.day) < (dt.month, dt.day))
+
+    def _data_table(self, kind, create=False):
+        """
+        Getter for a Dynamo DB data table.\n
+
+        :param kind:   'events' or 'birthdays'. (string)\n
+        :param create: Create the table when it does not exist. (boolean)\n
+        :return: Table (boto3 Table)\n
+        """
+        import botocore.exceptions
+
+        name, partition_key, sort_key = self._DATA_TABLES[kind]
+        table = self._get_dynamodb().Table(name)
+        try:
+            table.load()
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                raise
+            if not create:
+                raise RuntimeError("Dynamo DB table '%s' does not exist, publish the data first." % name)
+            table = self._get_dynamodb().create_table(
+                TableName=name,
+                KeySchema=[{'AttributeName': partition_key, 'KeyType': 'HASH'}, {'AttributeName': sort_key, 'KeyType': 'RANGE'}],
+                AttributeDefinitions=[{'AttributeName': partition_key, 'AttributeType': 'S'}, {'AttributeName': sort_key, 'AttributeType': 'S'}],
+                ProvisionedThroughput=self._DATA_THROUGHPUT)
+            table.wait_until_exists()
+        return table
+
+    @staticmethod
+    def _read_data_table(read, **kwargs):
+        """
+        Read all pages of a scan or query.\n
 
+        :param read: Table.scan or Table.query.\n
+        :param kwargs: Arguments of read.\n
+        :return: Items (list of dictionaries)\n
+        """
+        items = []
+        while True:
+            response = read(**kwargs)
+            items.extend(response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    @staticmethod
+    def _event_items(events):
+        """
+        Convert events to items of the events data table. The sort key is the last day of the event followed by its url
+        (and a counter when an url repeats), undated events sort before all dates.\n
+
+        :param events: Events in _RAW_EVENTS format.\n
+        :return: Items (list of dictionaries)\n
+        """
+        items = []
+        keys = set()
+        for i in range(len(events['Url'])):
+            dates = [day.isoformat() for day in events['Date'][i] or []]
+            key = base = u'%s#%s' % (dates[-1] if dates else u'', events['Url'][i])
+            occurrence = 0
+            while (events['Cat'][i], key) in keys:
+                occurrence += 1
+                key = u'%s#%d' % (base, occurrence)
+            keys.add((events['Cat'][i], key))
+            items.append({'Cat': events['Cat'][i], 'End': key, 'Dates': dates, 'Title': events['Title'][i], 'Loc': events['Loc'][i],
+                          'Url': events['Url'][i], 'Position': i})
+        return items
+
+    @staticmethod
+    def _birthday_items(bdays):
+        """
+        Convert birthdays to items of the birthdays data table, the sort key is the day followed by the url and name.
+        The relative time is not stored, it depends on the day the item is read.\n
+
+        :param bdays: Birthdays in _RAW_BDAYS format.\n
+        :return: Items (list of dictionaries)\n
+        """
+        return [{'Role': bdays['Role'][i], 'Day': u'%s#%s#%s' % (bdays['Date'][i].isoformat(), bdays['Url'][i], bdays['Name'][i]),
+                 'Name': bdays['Name'][i], 'Url': bdays['Url'][i], 'Position': i}
+                for i in range(len(bdays['Url']))]
+
+    @staticmethod
+    def _event_from_item(item):
+        dates = [DateParser.iso(day) for day in item['Dates']]
+        return Event(dates or None, item['Title'], item['Loc'], item['Cat'], item['Url'])
+
+    def _birthday_from_item(self, item):
+        day = DateParser.iso(item['Day'].split('#', 1)[0])
         curr_date = self._curr_date
+        relative_time = self._TODAY if day == curr_date else self._FUTURE if day > curr_date else self._PAST
+        return Birthday(day, item['Name'], item['Role'], relative_time, item['Url'])
 
-        soup = BeautifulSoup(parseable_text, "html.parser")
+    def publish(self):
+        """
+        Write the loaded events and birthdays to the Dynamo DB data tables (created when missing), so parsers with
+        DataInput.dynamodb share this scrape. Items that are no longer loaded are deleted.\n
 
-        tab = soup.find(self._p_d_tab, {self._p_d_tab_arg: self._p_d_tab_value})
-        rec = tab.find(self._p_d_rec_element, {self._p_d_rec_arg: self._p_d_rec_value})
-        date = rec.find(self._p_d_date_element, {self._p_d_date_arg: self._p_d_date_value}).text
-        dt = datetime.strptime(date, "%d-%m-%Y").date()
+        :return: Number of written and deleted items. (Dictionary with 'events' and 'birthdays' as key and a tuple (written, deleted) as value.)\n
+        """
+        self.prefetch()
+        result = {}
+        for kind, items in [('events', self._event_items(self._RAW_EVENTS)), ('birthdays', self._birthday_items(self._RAW_BDAYS))]:
+            _, partition_key, sort_key = self._DATA_TABLES[kind]
+            with self._metrics.timer('publish.' + kind):
+                table = self._data_table(kind, create=True)
+                stored = self._read_data_table(table.scan, ProjectionExpression='#p, #s',
+                                               ExpressionAttributeNames={'#p': partition_key, '#s': sort_key})
+                current = set((item[partition_key], item[sort_key]) for item in items)
+                stale = [key for key in set((item[partition_key], item[sort_key]) for item in stored) if key not in current]
+
+                with table.batch_writer() as batch:
+                    for item in items:
+                        batch.put_item(Item=item)
+                    for partition, sort in stale:
+                        batch.delete_item(Key={partition_key: partition, sort_key: sort})
+            result[kind] = (len(items), len(stale))
+        return result
+
+    def _get_events_dynamo_db(self):
+        items = self._read_data_table(self._data_table('events').scan)
+        items.sort(key=lambda item: item['Position'])
+        self._RAW_EVENTS = self._events_columns({'Date': [[DateParser.iso(day) for day in item['Dates']] or None for item in items],
+                                                 'Title': [item['Title'] for item in items], 'Loc': [item['Loc'] for item in items],
+                                                 'Cat': [item['Cat'] for item in items], 'Url': [item['Url'] for item in items]})
+
+    def _get_recent_birthdays_dynamo_db(self):
+        items = self._read_data_table(self._data_table('birthdays').scan)
+        items.sort(key=lambda item: item['Position'])
+        records = [self._birthday_from_item(item) for item in items]
+        self._RAW_BDAYS = self._birthdays_columns({'Date': [record.day for record in records], 'Name': [record.name for record in records],
+                                                   'Role': [record.role for record in records], 'RelativeTime': [record.relative_time for record in records],
+                                                   'Url': [record.url for record in records]})
+
+    def query_events(self, category, from_date=None, to_date=None):
+        """
+        Query the events of a category that end in a date range with a key condition on the Dynamo DB data table,
+        without loading the other events. By default the upcoming and ongoing events are returned.\n
 
-        # noinspection PyTypeChecker
-        return curr_date.year - dt.year - ((curr_date.month, curr_date.day) < (dt.month, dt.day))
+        :param category:  Event category, a key of the filter created in method filter_events_category. (string)\n
+        :param from_date: First day on which the events may end. (datetime.date) (default: today) (optional)\n
+        :param to_date:   Last day on which the events may end. (datetime.date) (default: no limit) (optional)\n
+        :return: Events sorted on their last day (List of dictionaries with keys: date, title, location, category, url.)\n
+        """
+        from boto3.dynamodb.conditions import Key
+
+        if from_date is None:
+            from_date = self._curr_date
+        end = Key('End').gte(from_date.isoformat()) if to_date is None else Key('End').between(from_date.isoformat(), to_date.isoformat() + u'#\uffff')
+        with self._metrics.timer('query.dynamodb.events'):
+            items = self._read_data_table(self._data_table('events').query, KeyConditionExpression=Key('Cat').eq(category) & end)
+        return [self._event_from_item(item).as_dict() for item in items]
+
+    def query_birthdays(self, role, from_date, to_date):
+        """
+        Query the birthdays of a role in a date range with a key condition on the Dynamo DB data table.\n
+
+        :param role:      Birthday category, a key of the filter created in method filter_bday_category. (string)\n
+        :param from_date: First day. (datetime.date)\n
+        :param to_date:   Last day. (datetime.date)\n
+        :return: Birthdays sorted on their day (List of dictionaries with keys: name, date, role, url.)\n
+        """
+        from boto3.dynamodb.conditions import Key
+
+        with self._metrics.timer('query.dynamodb.birthdays'):
+            items = self._read_data_table(self._data_table('birthdays').query,
+                                          KeyConditionExpression=Key('Role').eq(role) & Key('Day').between(from_date.isoformat(), to_date.isoformat() + u'#\uffff'))
+        return [self._birthday_from_item(item).as_dict() for item in items]
 
     def _validate_day(self, days, filter_days):
         """
@@ -433,6 +2473,76 @@ class SiouxParser:
 
         return False
 
+    def _get_event_index(self):
+        """
+        Getter for the interval index over _RAW_EVENTS, (re)built when the events are (re)loaded.\n
+
+        :return: Event index (_EventIndex)\n
+        """
+        if self._RAW_EVENTS is None:
+            self._get_events()
+        # Read the members once, refresh may replace them from another thread.
+        events = self._RAW_EVENTS
+        index = self._EVENT_INDEX
+        if index is None or index.source is not events:
+            index = self._EVENT_INDEX = _EventIndex(events)
+        return index
+
+    @staticmethod
+    def _event_record(events, i):
+        """
+        Create the record of an event.\n
+
+        :param events: Events in _RAW_EVENTS format, the source of the event index that was queried.\n
+        :param i: Position of the event in events. (int)\n
+        :return: Event (Event)\n
+        """
+        return Event(events['Date'][i], events['Title'][i], events['Loc'][i], events['Cat'][i], events['Url'][i])
+
+    def _query_events(self, index, filter_cat, filter_date, filter_title, matches=None):
+        """
+        Find the events respecting the filters with the event index.\n
+
+        :param index:        Event index returned by _get_event_index.\n
+        :param filter_cat:   Filter created in method filter_events_category.\n
+        :param filter_date:  Filter created in method filter_events_date.\n
+        :param filter_title: Substring that is required in event title.\n
+        :param matches:      Positions the result is restricted to, e.g. the matches of a search. (set of ints) (default: all events) (optional)\n
+        :return: Positions in the source of the index, in page order. (list of ints)\n
+        """
+        events = index.source
+
+        with self._metrics.timer('query.events'):
+            # Only an undated event that would be part of the result is an error.
+            for i in index.undated():
+                if filter_title in events['Title'][i] and filter_cat[events['Cat'][i]] and (matches is None or i in matches):
+                    raise RuntimeError('Event has no date!')
+
+            mask = index.mask([category for category, enabled in filter_cat.items() if enabled], filter_date[self._ONE_DAY], filter_date[self._MUL_DAY])
+            positions = index.query(mask, filter_date, self._curr_date, self._ONE_DAY, self._MUL_DAY, self._TODAY, self._FUTURE, self._PAST)
+            if filter_title:
+                titles = index.search(filter_title, 'Title')
+                positions = [i for i in positions if i in titles]
+            if matches is not None:
+                positions = [i for i in positions if i in matches]
+
+        self._metrics.count('rows.filtered.events', len(positions))
+        return positions
+
+    def _query_birthdays(self, bdays, filter_bday_category, filter_bday_date):
+        """
+        Find the birthdays respecting the filters.\n
+
+        :param bdays: Birthdays in _RAW_BDAYS format.\n
+        :param filter_bday_category: Filter created in method filter_bday_category.\n
+        :param filter_bday_date: Filter created in method filter_bday_date.\n
+        :return: Positions in bdays. (list of ints)\n
+        """
+        with self._metrics.timer('query.birthdays'):
+            positions = [i for i in range(len(bdays['Date'])) if bdays['RelativeTime'][i] in filter_bday_date and filter_bday_category[bdays['Role'][i]]]
+        self._metrics.count('rows.filtered.birthdays', len(positions))
+        return positions
+
     def authenticate(self, host=None):
         """
         Authenticate using netrc file.\n
@@ -451,8 +2561,57 @@ class SiouxParser:
         username, _, password = ret
         username = self._iis_domain + '\\' + username
 
-        self._session = requests.Session()
-        self._session.auth = HttpNtlmAuth(username, password)
+        with self._metrics.timer('auth'):
+            from requests_ntlm import HttpNtlmAuth
+
+            self._session = self._create_session()
+            self._session.auth = HttpNtlmAuth(username, password)
+            self._session_user = username
+            self._saved_cookies = None
+            self._restore_session_cookies()
+
+    def prefetch(self):
+        """
+        Load the events and birthdays in parallel, so a full refresh takes as long as the slowest source.\n
+        Data that is already loaded is not fetched again.\n
+
+        :return: None\n
+        """
+        loaders = []
+        if self._RAW_EVENTS is None:
+            loaders.append(self._get_events)
+        if self._RAW_BDAYS is None:
+            loaders.append(self._get_recent_birthdays)
+        self._run_loaders(loaders)
+
+    def refresh(self):
+        """
+        Load the events and birthdays again, in parallel.\n
+        The refresh is incremental: a page that is not modified (304) or has the same fingerprint as before is not parsed
+        and keeps its loaded data, of a changed page only the event/birthday blocks that changed are converted again.
+        The differences are added to the change feed, see get_changes.\n
+        The loaded data stays available until the new data replaces it, so queries from other threads can continue
+        during a refresh.\n
+
+        :return: None\n
+        """
+        self._run_loaders([self._get_events, self._get_recent_birthdays])
+
+    @staticmethod
+    def _run_loaders(loaders):
+        if len(loaders) < 2:
+            for loader in loaders:
+                loader()
+            return
+
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(len(loaders))
+        try:
+            pool.map(lambda loader: loader(), loaders)
+        finally:
+            pool.close()
+            pool.join()
 
     def get_base_url(self):
         """
@@ -479,8 +2638,9 @@ class SiouxParser:
         :param filter_title: Substring that is required in event title.\n
         :return: Next event. (Dictionary with keys: date, title, location, category)\n
         """
-        events = self.parse_events(filter_cat, filter_date, filter_title)
-        return events[0] if len(events) else []
+        for event in self.iter_events(filter_cat, filter_date, filter_title):
+            return event.as_dict()
+        return []
 
     def filter_events_category(self, social_partner, social_colleague, powwow, training, exp_group, presentation):
         """
@@ -563,23 +2723,113 @@ class SiouxParser:
         :param filter_title: Substring that is required in event title.\n
         :return: Events (List of dictionaries with keys: date, title, location, category, url.)\n
         """
-        results = []
+        return [event.as_dict() for event in self.iter_events(filter_cat, filter_date, filter_title)]
 
-        if self._RAW_EVENTS is None:
-            self._get_events()
+    def iter_events(self, filter_cat, filter_date, filter_title=""):
+        """
+        Lazily parse and filter events, an event is only formatted when it is consumed.\n
+
+        :param filter_cat:   Filter created in method filter_events_category.\n
+        :param filter_date:  Filter created in method filter_events_date.\n
+        :param filter_title: Substring that is required in event title.\n
+        :return: Events (Generator of Event records, which also support the keys: date, title, location, category, url.)\n
+        """
+        index = self._get_event_index()
+        for i in self._query_events(index, filter_cat, filter_date, filter_title):
+            yield self._event_record(index.source, i)
+
+    def search_events(self, keywords, filter_cat=None, filter_date=None, case_sensitive=False):
+        """
+        Search events on keywords in their title or location.\n
+
+        :param keywords:       Keyword or list of keywords, every keyword must be found in the title or the location. (string or list of strings)\n
+        :param filter_cat:     Filter created in method filter_events_category. (default: all categories) (optional)\n
+        :param filter_date:    Filter created in method filter_events_date. (default: all dates) (optional)\n
+        :param case_sensitive: Exact substring match or case insensitive match. (boolean) (default: False)\n
+        :return: Events (List of dictionaries with keys: date, title, location, category, url.)\n
+        """
+        if isinstance(keywords, basestring):
+            keywords = [keywords]
+
+        index = self._get_event_index()
+        if filter_cat is None:
+            filter_cat = dict.fromkeys(index.source['Cat'], True)
+        if filter_date is None:
+            filter_date = self.filter_events_date(one_day=True, mul_day=True, today=True, future=True, past=True)
+
+        matches = None
+        for keyword in keywords:
+            found = index.search(keyword, 'Title', case_sensitive) | index.search(keyword, 'Loc', case_sensitive)
+            matches = found if matches is None else matches & found
+
+        return [self._event_record(index.source, i).as_dict() for i in self._query_events(index, filter_cat, filter_date, "", matches)]
+
+    def parse_events_multi(self, queries):
+        """
+        Evaluate several event queries in a single pass over the events.\n
+        The pass stops as soon as every query reached its limit.\n
+
+        :param queries: Queries (List of tuples (filter_cat, filter_date, filter_title, limit), limit None means no limit.)\n
+        :return: Events per query (List of lists of dictionaries with keys: date, title, location, category, url.)\n
+        """
+        index = self._get_event_index()
+        events = index.source
+        current_date = self._curr_date.toordinal()
+        results = [[] for _ in queries]
+
+        # The date filter only depends on the duration of an event and on where it ends/starts relative to today.
+        allowed = []
+        for filter_cat, filter_date, filter_title, limit in queries:
+            periods = set()
+            if filter_date[self._PAST]:
+                periods.add(self._PAST)
+            if filter_date[self._TODAY]:
+                periods.add(self._TODAY)
+            if filter_date[self._FUTURE]:
+                periods.add(self._FUTURE)
+                if filter_date[self._TODAY]:
+                    periods.add(self._ONGOING)
+            durations = set(duration for duration in [self._ONE_DAY, self._MUL_DAY] if filter_date[duration])
+            allowed.append(set((duration, period) for duration in durations for period in periods))
+
+        pending = [q for q in range(len(queries)) if queries[q][3] is None or queries[q][3] > 0]
+        titles, categories = events['Title'], events['Cat']
+        for i in range(len(titles)):
+            if not pending:
+                break
+
+            days = index.bounds(i)
+            day_class = None
+            if days is not None:
+                first, second, last = days
+                duration = self._MUL_DAY if first != second else self._ONE_DAY
+                if last < current_date:
+                    period = self._PAST
+                elif last == current_date:
+                    period = self._TODAY
+                elif first <= current_date:
+                    period = self._ONGOING
+                else:
+                    period = self._FUTURE
+                day_class = (duration, period)
+
+            title, category = titles[i], categories[i]
+            formatted = None
+            for q in list(pending):
+                filter_cat, filter_date, filter_title, limit = queries[q]
+                if not (filter_title in title and filter_cat[category]):
+                    continue
+                if day_class is None:
+                    raise RuntimeError('Event has no date!')
+                if day_class not in allowed[q]:
+                    continue
+
+                if formatted is None:
+                    formatted = self._event_record(events, i).as_dict()
+                results[q].append(dict(formatted))
+                if limit is not None and len(results[q]) >= limit:
+                    pending.remove(q)
 
-        events = self._RAW_EVENTS
-        for i in range(len(events['Date'])):
-            if not (filter_title in events['Title'][i] and filter_cat[events['Cat'][i]] and self._validate_day(events['Date'][i], filter_date)):
-                continue
-            if len(events['Date'][i]) == 2 and events['Date'][i][0] != events['Date'][i][1]:
-                time = events['Date'][i][0].strftime('%d/%m/%Y') + " - " + events['Date'][i][1].strftime('%d/%m/%Y')
-            elif len(events['Date'][i]) == 1 or events['Date'][i][0] == events['Date'][i][1]:
-                time = events['Date'][i][0].strftime('%d/%m/%Y')
-            else:
-                time = None
-            result = {'date': time, 'title': events['Title'][i], 'location': events['Loc'][i], 'category': events['Cat'][i], 'url': events['Url'][i]}
-            results.append(result)
         return results
 
     def parse_birthdays(self, filter_bday_category, filter_bday_date):
@@ -590,32 +2840,198 @@ class SiouxParser:
         :param filter_bday_date: Filter created in method filter_bday_date.\n
         :return: Birthdays (List of dictionaries with keys: name, date, role, url, [new age].)\n
         """
-        results = []
+        if self._RAW_BDAYS is None:
+            self._get_recent_birthdays()
+
+        # Only collegues get an age, fetch all their birth dates at once.
+        if filter_bday_category[self._AGE]:
+            bdays = self._RAW_BDAYS
+            self._get_birth_dates([bdays['Url'][i] for i in self._query_birthdays(bdays, filter_bday_category, filter_bday_date) if bdays['Role'][i] == self._bday_collegue])
+
+        return [bday.as_dict() for bday in self.iter_birthdays(filter_bday_category, filter_bday_date)]
+
+    def iter_birthdays(self, filter_bday_category, filter_bday_date):
+        """
+        Lazily parse and filter birthdays, the age of a person is only fetched when the birthday is consumed.\n
 
+        :param filter_bday_category: Filter created in method filter_bday_category.\n
+        :param filter_bday_date: Filter created in method filter_bday_date.\n
+        :return: Birthdays (Generator of Birthday records, which also support the keys: name, date, role, url, [new age].)\n
+        """
         if self._RAW_BDAYS is None:
             self._get_recent_birthdays()
 
         bdays = self._RAW_BDAYS
-
-        for i in range(len(bdays['Date'])):
-            if bdays['RelativeTime'][i] in filter_bday_date and filter_bday_category[bdays['Role'][i]]:
-                if filter_bday_category[self._AGE]:
-                    temp_age = self._get_persons_age(bdays['Url'][i])
-                    if bdays['Role'][i] == self._bday_collegue:
-                        age = (temp_age if not bdays['RelativeTime'][i] == self._FUTURE else temp_age + 1)  # age should reflect how old someone will become this year.
-                    else:
-                        age = -1
-                    result = {'name': bdays['Name'][i], 'date': bdays['Date'][i].strftime('%d/%m/%Y'),
-                              'role': bdays['Role'][i], 'url': bdays['Url'][i], 'age': age}
+        for i in self._query_birthdays(bdays, filter_bday_category, filter_bday_date):
+            result = Birthday(bdays['Date'][i], bdays['Name'][i], bdays['Role'][i], bdays['RelativeTime'][i], bdays['Url'][i])
+            if filter_bday_category[self._AGE]:
+                if result.role == self._bday_collegue:
+                    temp_age = self._get_persons_age(result.url)
+                    result.age = (temp_age if not result.relative_time == self._FUTURE else temp_age + 1)  # age should reflect how old someone will become this year.
                 else:
-                    result = {'name': bdays['Name'][i], 'date': bdays['Date'][i].strftime('%d/%m/%Y'),
-                              'role': bdays['Role'][i], 'url': bdays['Url'][i]}
-                results.append(result)
-        return results
+                    result.age = -1
+            yield result
+
+
+class SiouxDaemon:
+    """
+    Keeps a parser, its authenticated session and its parsed data resident, refreshes the data in the background and
+    answers queries over a Unix socket. SiouxClient.py is the matching client.\n
+    Protocol: one JSON object per line, {"method": <name>, "params": {<keyword arguments>}}, answered by one line
+    {"result": <value>} or {"error": <message>}. Filters are passed as the keyword arguments of the filter_* methods.\n
+    """
+    _SOCKET_FILE = '~/.sioux_parser.sock'
+    _REFRESH_INTERVAL = 3600
+    _METHODS = ['parse_events', 'get_next_event', 'parse_events_multi', 'parse_birthdays', 'get_changes', 'get_base_url', 'get_events_overview_url', 'status']
+
+    def __init__(self, parser, path_socket=None, refresh_interval=None):
+        """
+        :param parser:           Parser that is served. (SiouxParser)\n
+        :param path_socket:      Path of the Unix socket. (default: ~/.sioux_parser.sock) (optional)\n
+        :param refresh_interval: Seconds between two refreshes of the data. (default: 3600) (optional)\n
+        """
+        self._parser = parser
+        self._path_socket = os.path.expanduser(path_socket if path_socket is not None else self._SOCKET_FILE)
+        self._refresh_interval = refresh_interval if refresh_interval is not None else self._REFRESH_INTERVAL
+        self._stopped = threading.Event()
+        self._server = None
+        self._last_refresh = None
+        self._last_error = None
+
+    def _refresh(self):
+        try:
+            self._parser.refresh()
+            self._last_refresh = time.time()
+            self._last_error = None
+        except Exception as e:
+            # Keep serving the previous data, the next refresh may succeed.
+            self._last_error = '%s: %s' % (type(e).__name__, e)
+            sys.stderr.write('Refresh failed: %s\n' % self._last_error)
+
+    def _refresh_loop(self):
+        while not self._stopped.wait(self._refresh_interval):
+            self._refresh()
+
+    def status(self):
+        return {'last_refresh': self._last_refresh, 'last_error': self._last_error, 'refresh_interval': self._refresh_interval}
+
+    def _event_filters(self, filter_cat, filter_date):
+        return self._parser.filter_events_category(**filter_cat), self._parser.filter_events_date(**filter_date)
+
+    def parse_events(self, filter_cat, filter_date, filter_title=""):
+        return self._parser.parse_events(*self._event_filters(filter_cat, filter_date), filter_title=filter_title)
+
+    def get_next_event(self, filter_cat, filter_date, filter_title=""):
+        return self._parser.get_next_event(*self._event_filters(filter_cat, filter_date), filter_title=filter_title)
+
+    def parse_events_multi(self, queries):
+        return self._parser.parse_events_multi([self._event_filters(filter_cat, filter_date) + (filter_title, limit)
+                                                for filter_cat, filter_date, filter_title, limit in queries])
+
+    def parse_birthdays(self, filter_bday_category, filter_bday_date):
+        return self._parser.parse_birthdays(self._parser.filter_bday_category(**filter_bday_category), self._parser.filter_bday_date(**filter_bday_date))
+
+    def get_changes(self):
+        return self._parser.get_changes()
+
+    def get_base_url(self):
+        return self._parser.get_base_url()
+
+    def get_events_overview_url(self):
+        return self._parser.get_events_overview_url()
+
+    def handle(self, line):
+        """
+        Answer one request of the protocol.\n
+
+        :param line: Request. (JSON string)\n
+        :return: Answer. (JSON string)\n
+        """
+        try:
+            request = json.loads(line)
+            method = request.get('method')
+            if method not in self._METHODS:
+                raise RuntimeError("Unknown method '%s'. Use one of: %s" % (method, ', '.join(self._METHODS)))
+            answer = {'result': getattr(self, method)(**request.get('params', {}))}
+        except Exception as e:
+            answer = {'error': '%s: %s' % (type(e).__name__, e)}
+        return json.dumps(answer, separators=(',', ':'), default=_json_default)
+
+    def _remove_stale_socket(self):
+        try:
+            mode = os.lstat(self._path_socket).st_mode
+        except OSError:
+            return
+        # Only a left over socket is removed, never a file that was given as socket path by mistake.
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError("'%s' exists and is not a socket." % self._path_socket)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self._path_socket)
+        except socket.error:
+            os.remove(self._path_socket)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError("A daemon is already listening on '%s'." % self._path_socket)
+
+    def serve_forever(self):
+        """
+        Load the data, then serve queries until shutdown is called.\n
+
+        :return: None\n
+        """
+        self._refresh()
+        self._remove_stale_socket()
+
+        import SocketServer
+
+        daemon = self
+
+        class Handler(SocketServer.StreamRequestHandler):
+            def handle(self):
+                for line in iter(self.rfile.readline, ''):
+                    if line.strip():
+                        self.wfile.write(daemon.handle(line) + '\n')
+                        self.wfile.flush()
+
+        # The socket is created by bind, create it only readable and writable by the current user.
+        umask = os.umask(0o177)
+        try:
+            self._server = SocketServer.ThreadingUnixStreamServer(self._path_socket, Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+
+        refresher = threading.Thread(target=self._refresh_loop)
+        refresher.daemon = True
+        refresher.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            if os.path.exists(self._path_socket):
+                os.remove(self._path_socket)
+
+    def shutdown(self):
+        """
+        Stop serve_forever, from another thread.\n
+
+        :return: None\n
+        """
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
 
 
 # Main program:
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'daemon':
+        # Usage: SiouxParser.py daemon [path config file] [path socket]
+        daemon_parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet, path_config_file=sys.argv[2] if len(sys.argv) > 2 else None)
+        SiouxDaemon(daemon_parser, path_socket=sys.argv[3] if len(sys.argv) > 3 else None).serve_forever()
+        sys.exit(0)
     # parser = SiouxParser(config_input=ConfigInput.dynamodb, data_input=DataInput.local_json)
     parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet)
 
@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir)
+sys.path.insert(0, _ROOT)
+sys.path.insert(0, os.path.join(_ROOT, 'tools'))
+
+from SiouxParser import SiouxParser
+from SiouxParser import ConfigInput
+from SiouxParser import DataInput
+
+CONFIG = {
+    'URLS': {'IIS_DOMAIN': 'sioux', 'BASE': 'http://intra', 'BASE_INTRA': 'http://intra/', 'EVENTS_OVERVIEW_EXT': 'events', 'BDAY_EXT': 'bdays'},
+    'EVENTS': {'SOCIAL_PARTNER': 'Social partner', 'SOCIAL_COLLEAGUE': 'Social colleague', 'POWWOW': 'Powwow', 'TRAINING': 'Training',
+               'EXP_GROUP': 'Expertise group', 'PRESENTATION': 'Presentation'},
+    'PARSE_EV': {'ELEMENT_EV': 'div', 'ARG_EV': 'class', 'VALUE_DATE_EV': 'ev-date', 'VALUE_TITLE_EV': 'ev-title', 'VALUE_LOCATION_EV': 'ev-loc',
+                 'VALUE_CATEGORY_EV': 'ev-cat'},
+    'PARSE_BDAY': {'ELEMENT_BDAY': 'div', 'ARG_BDAY': 'id', 'VALUE_OVERALL_BDAY': 'bdays', 'VALUE_SEPARATE_BDAY': 'a', 'TITLE_TODAY_BDAY': 'Vandaag jarig',
+                   'TITLE_FUTURE_BDAY': 'Binnenkort jarig', 'TITLE_PAST_BDAY': 'Recent jarig', 'ROLE_COLLEGUE_BDAY': 'collegue',
+                   'ROLE_COLLEGUE_CHILD': 'child', 'ROLE_COLLEGUE_PARTNER': 'partner'},
+    'P_D': {'TAB': 'table', 'TAB_ARG': 'id', 'TAB_VALUE': 'persondata', 'REC_ELEMENT': 'tr', 'REC_ARG': 'class', 'REC_VALUE': 'dob',
+            'DATE_ELEMENT': 'td', 'DATE_ARG': 'class', 'DATE_VALUE': 'value'}
+}
+
+
+class DirectoryTestCase(unittest.TestCase):
+    """
+    Test case with a temporary directory holding config.ini.\n
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, SiouxParser._CONFIG_FILE), 'w') as fp:
+            for section, values in sorted(CONFIG.items()):
+                fp.write('[%s]\n' % section)
+                for key, value in sorted(values.items()):
+                    fp.write('%s = %s\n' % (key, value))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def local_parser(self, events, birthdays, **kwargs):
+        """
+        :param events:    Events in the format of sioux_events.json.\n
+        :param birthdays: Birthdays in the format of sioux_birthdays.json.\n
+        :param kwargs:    Other arguments of SiouxParser.\n
+        :return: Parser that reads the events and birthdays from JSON files. (SiouxParser)\n
+        """
+        paths = [os.path.join(self.directory, 'sioux_events.json'), os.path.join(self.directory, 'sioux_birthdays.json')]
+        for path, data in zip(paths, [events, birthdays]):
+            with open(path, 'w') as fp:
+                json.dump(data, fp)
+        return SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.local_json, path_config_file=self.directory, path_json_file=paths,
+                           **kwargs)
@@ -0,0 +1,91 @@
+import os
+import unittest
+
+from support import DirectoryTestCase
+from SiouxParser import SiouxParser
+from SiouxParser import ConfigInput
+from SiouxParser import DataInput
+
+try:
+    import moto
+    from SiouxConvertDynamoDB import SiouxConvertDynamoDB
+except ImportError:
+    moto = None
+
+_SETTINGS = ['us-west-2', None]
+
+
+@unittest.skipIf(moto is None, 'moto is not installed')
+class ConvertDynamoDbTest(DirectoryTestCase):
+    def setUp(self):
+        DirectoryTestCase.setUp(self)
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        self._mock = moto.mock_dynamodb2()
+        self._mock.start()
+        self.converter = SiouxConvertDynamoDB(path_config_file=self.directory, dynamo_db_settings=_SETTINGS)
+
+    def tearDown(self):
+        self._mock.stop()
+        DirectoryTestCase.tearDown(self)
+
+    def _read_config(self):
+        parser = SiouxParser(config_input=ConfigInput.dynamodb, data_input=DataInput.local_json, dynamo_db_settings=_SETTINGS)
+        return parser._dynamo_db_config
+
+    def test_sync(self):
+        report = self.converter.sync()
+        self.assertEqual(len(report['created']), 5)
+        self.assertEqual((report['put'], report['deleted'], report['unchanged']), (36, 0, 0))
+
+        report = self.converter.sync()
+        self.assertEqual((report['created'], report['put'], report['deleted'], report['unchanged']), ([], 0, 0, 36))
+        self.assertEqual(self._read_config()['EVENTS']['POWWOW'], 'Powwow')
+
+    def test_cached_config(self):
+        self.converter.sync()
+        parser = SiouxParser(config_input=ConfigInput.dynamodb, data_input=DataInput.local_json, dynamo_db_settings=_SETTINGS,
+                             path_cache_dir=self.directory)
+        self.assertIsNotNone(parser._dynamodb)
+
+        # A cache hit does not touch Dynamo DB at all.
+        self.converter.tables['EVENTS'].put_item(Item={'key': 'POWWOW', 'value': 'Pow wow', 'updated': 1})
+        parser = SiouxParser(config_input=ConfigInput.dynamodb, data_input=DataInput.local_json, dynamo_db_settings=_SETTINGS,
+                             path_cache_dir=self.directory)
+        self.assertIsNone(parser._dynamodb)
+        self.assertEqual(parser._dynamo_db_config['EVENTS']['POWWOW'], 'Powwow')
+
+    def test_read_during_sync(self):
+        self.converter.sync()
+        self.converter.tables['URLS'].put_item(Item={'key': 'UNUSED', 'value': 'x'})
+        self.converter._conf.set('EVENTS', 'POWWOW', 'Pow wow')
+        self.converter._conf.set('URLS', 'BASE', 'http://intranet')
+
+        # Read the configuration like a parser after every batch request of the sync.
+        reads = []
+
+        def read(**kwargs):
+            try:
+                config = self._read_config()
+            except SystemExit:
+                config = None
+            reads.append(config)
+        self.converter._client.meta.events.register('after-call.dynamodb.BatchWriteItem', read)
+
+        report = self.converter.sync()
+        self.assertEqual((report['put'], report['deleted'], report['unchanged']), (2, 3, 34))
+
+        self.assertTrue(reads)
+        self.assertNotIn(None, reads)
+        for config in reads:
+            self.assertIn(config['EVENTS']['POWWOW'], ['Powwow', 'Pow wow'])
+            self.assertIn(config['URLS']['BASE'], ['http://intra', 'http://intranet'])
+        # Both entries of the replaced keys existed during a read, the new one was used.
+        self.assertIn({'POWWOW': 'Pow wow', 'BASE': 'http://intranet', 'UNUSED': 'x'},
+                      [{'POWWOW': config['EVENTS']['POWWOW'], 'BASE': config['URLS']['BASE'], 'UNUSED': config['URLS'].get('UNUSED')} for config in reads])
+        self.assertEqual((reads[-1]['EVENTS']['POWWOW'], reads[-1]['URLS']['BASE']), ('Pow wow', 'http://intranet'))
+        self.assertNotIn('UNUSED', reads[-1]['URLS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
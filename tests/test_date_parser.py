@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import date
+
+import support  # Puts the repository on sys.path.
+from SiouxParser import DateParser
+
+
+class DateParserTest(unittest.TestCase):
+    def test_event_dates(self):
+        self.assertEqual(DateParser.event_dates(u"16 okt '17 - 18 okt '17"), [date(2017, 10, 16), date(2017, 10, 18)])
+        self.assertEqual(DateParser.event_dates(u"\n\t 01 mrt '18 "), [date(2018, 3, 1)])
+        self.assertEqual(DateParser.event_dates(u"31 mei '19 - 02 jun '19"), [date(2019, 5, 31), date(2019, 6, 2)])
+        self.assertEqual(DateParser.event_dates(u"05 may '20 - 06 oct '20"), [date(2020, 5, 5), date(2020, 10, 6)])
+        self.assertIsNone(DateParser.event_dates(u'Datum volgt'))
+
+    def test_event_dates_two_digit_years(self):
+        # Like strptime: 69-99 are 1969-1999, 00-68 are 2000-2068.
+        self.assertEqual(DateParser.event_dates(u"01 jan '00"), [date(2000, 1, 1)])
+        self.assertEqual(DateParser.event_dates(u"31 dec '68"), [date(2068, 12, 31)])
+        self.assertEqual(DateParser.event_dates(u"01 jan '69"), [date(1969, 1, 1)])
+        self.assertEqual(DateParser.event_dates(u"15 aug '99"), [date(1999, 8, 15)])
+
+    def test_day_month_dutch(self):
+        for string, expected in [(u'16 nov', date(2017, 11, 16)), (u'16 mei', date(2017, 5, 16)), (u'3 mrt', date(2017, 3, 3)),
+                                 (u'3 maart', date(2017, 3, 3)), (u'1 okt', date(2017, 10, 1)), (u'7 Juli', date(2017, 7, 7)),
+                                 (u'30 dec.', date(2017, 12, 30))]:
+            self.assertEqual(DateParser.day_month(string, 2017), expected, string)
+
+    def test_day_month_english(self):
+        for string, expected in [(u'Nov 16', date(2017, 11, 16)), (u'May 16', date(2017, 5, 16)), (u'Mar 3', date(2017, 3, 3)),
+                                 (u'October 1', date(2017, 10, 1)), (u'Sept 9', date(2017, 9, 9))]:
+            self.assertEqual(DateParser.day_month(string, 2017), expected, string)
+
+    def test_day_month_year(self):
+        self.assertEqual(DateParser.day_month(u'29 feb', 2016), date(2016, 2, 29))
+        self.assertRaises(ValueError, DateParser.day_month, u'29 feb', 2017)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, DateParser.day_month, u'16 foo', 2017)
+        self.assertRaises(ValueError, DateParser.day_month, u'vandaag', 2017)
+        self.assertRaises(ValueError, DateParser.event_dates, u"16 foo '17")
+
+    def test_iso_and_dmy(self):
+        self.assertEqual(DateParser.iso(u'2017-10-16'), date(2017, 10, 16))
+        self.assertEqual(DateParser.dmy(u'05-03-1980'), date(1980, 3, 5))
+        self.assertRaises(ValueError, DateParser.iso, u'16-10-2017')
+
+
+if __name__ == '__main__':
+    unittest.main()
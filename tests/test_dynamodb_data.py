@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import os
+import unittest
+from datetime import date, timedelta
+
+from support import DirectoryTestCase
+from SiouxParser import SiouxParser
+from SiouxParser import ConfigInput
+from SiouxParser import DataInput
+
+try:
+    import moto
+    import moto.dynamodb2.models
+except ImportError:
+    moto = None
+
+_TODAY = date.today()
+_SETTINGS = ['us-west-2', None]
+
+
+def _day(offset):
+    return (_TODAY + timedelta(days=offset)).isoformat()
+
+
+@unittest.skipIf(moto is None, 'moto is not installed')
+class DynamoDbDataTest(DirectoryTestCase):
+    def setUp(self):
+        DirectoryTestCase.setUp(self)
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        self._mock = moto.mock_dynamodb2()
+        self._mock.start()
+
+        # moto measures item sizes with str(value), which fails on non-ASCII unicode under Python 2.
+        self._bytesize = moto.dynamodb2.models.bytesize
+        moto.dynamodb2.models.bytesize = lambda value: len(value.encode('utf-8') if isinstance(value, unicode) else str(value))
+
+        self.events = {'Date': [[_day(-3)], [_day(2), _day(4)], [_day(5)], [_day(1)]],
+                       'Title': [u'Linux Kennisdelen', u'Ski trip', u'Caf\xe9 night', u'Python talk'],
+                       'Loc': [u'Room 1', u'Alps', u'Caf\xe9', u'Room 2'],
+                       'Cat': [u'Powwow', u'Social partner', u'Powwow', u'Training'],
+                       'Url': [u'http://intra/ev/1', u'http://intra/ev/2', u'http://intra/ev/3', u'http://intra/ev/4']}
+        # The birthday of yesterday was published as 'future', the reader computes its relative time itself.
+        self.birthdays = {'Date': [_day(0), _day(3), _day(-1)],
+                          'Name': [u'Zo\xeb Peeters', u'Jan Janssens', u'Piet Pieters'],
+                          'Role': [u'collegue', u'child', u'collegue'],
+                          'RelativeTime': [u'today', u'future', u'future'],
+                          'Url': [u'http://intra/p/1', u'http://intra/p/2', u'http://intra/p/3']}
+        self.publisher = self.local_parser(self.events, self.birthdays, dynamo_db_settings=_SETTINGS)
+
+    def tearDown(self):
+        moto.dynamodb2.models.bytesize = self._bytesize
+        self._mock.stop()
+        DirectoryTestCase.tearDown(self)
+
+    def _reader(self):
+        return SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.dynamodb, path_config_file=self.directory,
+                           dynamo_db_settings=_SETTINGS)
+
+    def test_round_trip(self):
+        self.assertEqual(self.publisher.publish(), {'events': (4, 0), 'birthdays': (3, 0)})
+        reader = self._reader()
+
+        all_categories = reader.filter_events_category(True, True, True, True, True, True)
+        all_dates = reader.filter_events_date(True, True, True, True, True)
+        self.assertEqual(reader.parse_events(all_categories, all_dates), self.publisher.parse_events(all_categories, all_dates))
+
+        categories = reader.filter_bday_category(True, True, True, False)
+        birthdays = reader.parse_birthdays(categories, reader.filter_bday_date(True, True, True))
+        self.assertEqual([birthday['name'] for birthday in birthdays], self.birthdays['Name'])
+        self.assertEqual([birthday['name'] for birthday in reader.parse_birthdays(categories, reader.filter_bday_date(False, False, True))],
+                         [u'Piet Pieters'])
+
+    def test_queries(self):
+        self.publisher.publish()
+        reader = self._reader()
+
+        self.assertEqual([event['title'] for event in reader.query_events(u'Powwow')], [u'Caf\xe9 night'])
+        self.assertEqual([event['title'] for event in reader.query_events(u'Powwow', _TODAY - timedelta(days=7), _TODAY)], [u'Linux Kennisdelen'])
+        self.assertEqual([event['date'] for event in reader.query_events(u'Social partner')],
+                         [(_TODAY + timedelta(days=2)).strftime('%d/%m/%Y') + ' - ' + (_TODAY + timedelta(days=4)).strftime('%d/%m/%Y')])
+
+        collegues = reader.query_birthdays(u'collegue', _TODAY - timedelta(days=1), _TODAY)
+        self.assertEqual([birthday['name'] for birthday in collegues], [u'Piet Pieters', u'Zo\xeb Peeters'])
+        self.assertEqual(reader.query_birthdays(u'child', _TODAY + timedelta(days=4), _TODAY + timedelta(days=9)), [])
+
+    def test_new_year(self):
+        # The birthday page shows no year, so the recent and upcoming birthdays around New Year are in another year.
+        now = [date(2027, 1, 2)]
+        curr_date = SiouxParser.__dict__['_curr_date']
+        SiouxParser._curr_date = property(lambda parser: now[0])
+        self.addCleanup(setattr, SiouxParser, '_curr_date', curr_date)
+
+        page = (u'<html><body><div id="bdays"><h3>Binnenkort jarig</h3><a class="collegue" href="/p/1">Zo\xeb Peeters (5 jan)</a><br>'
+                u'<h3>Recent jarig</h3><a class="collegue" href="/p/2">Piet Pieters (30 dec)</a><br></div></body></html>')
+        parsed = self.publisher._parse_birthdays_html(page)
+        self.assertEqual(parsed['Date'], [date(2027, 1, 5), date(2026, 12, 30)])
+        self.assertEqual(parsed['RelativeTime'], [u'future', u'past'])
+
+        birthdays = dict(parsed, Date=[day.isoformat() for day in parsed['Date']])
+        self.local_parser(self.events, birthdays, dynamo_db_settings=_SETTINGS).publish()
+        reader = self._reader()
+        categories = reader.filter_bday_category(True, True, True, False)
+        self.assertEqual([(birthday['name'], birthday['date']) for birthday in reader.parse_birthdays(categories, reader.filter_bday_date(False, False, True))],
+                         [(u'Piet Pieters', '30/12/2026')])
+        self.assertEqual([birthday['name'] for birthday in reader.query_birthdays(u'collegue', date(2026, 12, 28), date(2027, 1, 5))],
+                         [u'Piet Pieters', u'Zo\xeb Peeters'])
+
+        now[0] = date(2026, 12, 30)
+        parsed = self.publisher._parse_birthdays_html(page.replace(u'5 jan', u'Jan 1').replace(u'30 dec', u'28 dec'))
+        self.assertEqual(parsed['Date'], [date(2027, 1, 1), date(2026, 12, 28)])
+
+    def test_publish_again(self):
+        self.publisher.publish()
+        reader = self._reader()
+        reader.prefetch()
+
+        for column in self.events.values():
+            del column[1]
+        self.assertEqual(self.local_parser(self.events, self.birthdays, dynamo_db_settings=_SETTINGS).publish(),
+                         {'events': (3, 1), 'birthdays': (3, 0)})
+
+        reader.refresh()
+        self.assertEqual([event['url'] for event in reader.get_changes()['events']['removed']], [u'http://intra/ev/2'])
+        self.assertEqual(reader.query_events(u'Social partner'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import itertools
+import unittest
+from datetime import date, timedelta
+
+from support import DirectoryTestCase
+
+_TODAY = date.today()
+
+# Days of the events relative to today: one day, the same day twice and multiple days, in no particular order.
+_EVENT_DAYS = [[2], [-3], [0], [-1, -1], [0, 0], [4, 4], [-5, -2], [-2, 0], [-1, 2], [0, 3], [2, 5], [-7], [1, 1], [-4, -4], [3, 9]]
+_CATEGORIES = [u'Powwow', u'Training', u'Social partner']
+
+
+class EventIndexTest(DirectoryTestCase):
+    """
+    The interval index of parse_events and the period classes of parse_events_multi must select the same events as
+    _validate_day.\n
+    """
+    def setUp(self):
+        DirectoryTestCase.setUp(self)
+        count = len(_EVENT_DAYS)
+        events = {'Date': [[(_TODAY + timedelta(days=offset)).isoformat() for offset in days] for days in _EVENT_DAYS],
+                  'Title': [u'Event %d' % i for i in range(count)],
+                  'Loc': [u'Room %d' % (i % 3) for i in range(count)],
+                  'Cat': [_CATEGORIES[i % len(_CATEGORIES)] for i in range(count)],
+                  'Url': [u'http://intra/ev/%d' % i for i in range(count)]}
+        self.parser = self.local_parser(events, {'Date': [], 'Name': [], 'Role': [], 'RelativeTime': [], 'Url': []})
+        self.parser.prefetch()
+
+        self.date_filters = [self.parser.filter_events_date(*flags) for flags in itertools.product([True, False], repeat=5)]
+        self.cat_filters = [self.parser.filter_events_category(True, True, True, True, True, True),
+                            self.parser.filter_events_category(True, False, True, False, False, False)]
+
+    def _expected(self, filter_cat, filter_date, filter_title=u''):
+        events = self.parser._RAW_EVENTS
+        return [events['Url'][i] for i in range(len(events['Url']))
+                if filter_title in events['Title'][i] and filter_cat[events['Cat'][i]]
+                and self.parser._validate_day(list(events['Date'][i]), filter_date)]
+
+    def test_parse_events(self):
+        for filter_cat in self.cat_filters:
+            for filter_date in self.date_filters:
+                self.assertEqual([event['url'] for event in self.parser.parse_events(filter_cat, filter_date)],
+                                 self._expected(filter_cat, filter_date), filter_date)
+
+    def test_parse_events_title(self):
+        filter_cat = self.cat_filters[0]
+        for filter_date in self.date_filters:
+            self.assertEqual([event['url'] for event in self.parser.parse_events(filter_cat, filter_date, u'Event 1')],
+                             self._expected(filter_cat, filter_date, u'Event 1'), filter_date)
+
+    def test_parse_events_multi(self):
+        queries = [(filter_cat, filter_date, u'', None) for filter_cat in self.cat_filters for filter_date in self.date_filters]
+        results = self.parser.parse_events_multi(queries)
+        for (filter_cat, filter_date, _, _), result in zip(queries, results):
+            self.assertEqual([event['url'] for event in result], self._expected(filter_cat, filter_date), filter_date)
+
+    def test_parse_events_multi_limit(self):
+        queries = [(self.cat_filters[1], filter_date, u'', 2) for filter_date in self.date_filters]
+        results = self.parser.parse_events_multi(queries)
+        for (filter_cat, filter_date, _, _), result in zip(queries, results):
+            self.assertEqual([event['url'] for event in result], self._expected(filter_cat, filter_date)[:2], filter_date)
+
+
+if __name__ == '__main__':
+    unittest.main()
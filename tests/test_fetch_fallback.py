@@ -0,0 +1,88 @@
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import BaseHTTPServer
+import SocketServer
+
+from support import DirectoryTestCase
+from SiouxParser import SiouxParser
+from SiouxParser import ConfigInput
+from SiouxParser import DataInput
+
+_EVENTS = {'Date': [['2026-10-17']], 'Title': [u'Python talk'], 'Loc': [u'Room 1'], 'Cat': [u'Training'], 'Url': [u'http://intra/ev/1']}
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    def handle_error(self, request, client_address):
+        # The parser hangs up on a stalled body.
+        pass
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Serves the events, or stalls after the first bytes of the body when the server is stalling.\n
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps(_EVENTS)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not self.server.stalling:
+            self.wfile.write(body)
+            return
+        self.wfile.write(body[:10])
+        self.wfile.flush()
+        self.server.released.wait(5)
+
+
+class FetchFallbackTest(DirectoryTestCase):
+    def setUp(self):
+        DirectoryTestCase.setUp(self)
+        self.cache = tempfile.mkdtemp()
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.server.stalling = False
+        self.server.released = threading.Event()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = 'http://127.0.0.1:%d/sioux_events.json' % self.server.server_port
+
+    def tearDown(self):
+        self.server.released.set()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache, ignore_errors=True)
+        DirectoryTestCase.tearDown(self)
+
+    def _parser(self):
+        parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.remote_json, path_config_file=self.directory,
+                             path_json_file=[self.url, self.url], path_cache_dir=self.cache,
+                             http_settings={'timeout': 1, 'deadline': 3, 'retries': 0})
+        parser._session = parser._create_session()
+        return parser
+
+    def test_stalled_body(self):
+        self._parser()._get_events_remote_json()
+        self.server.stalling = True
+
+        parser = self._parser()
+        start = time.time()
+        parser._get_events_remote_json()
+        self.assertLess(time.time() - start, 3)
+        self.assertEqual(list(parser._RAW_EVENTS['Title']), [u'Python talk'])
+
+        # With the events loaded, the stalled body keeps them.
+        self.assertIsNone(parser._fetch_parsed(self.url, parser._read_events_json, parser._fix_events_json, stream=True, resident=True))
+
+        shutil.rmtree(self.cache)
+        self.assertRaises(RuntimeError, self._parser()._get_events_remote_json)
+
+
+if __name__ == '__main__':
+    unittest.main()
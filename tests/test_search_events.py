@@ -0,0 +1,31 @@
+import unittest
+from datetime import date, timedelta
+
+from support import DirectoryTestCase
+
+_TOMORROW = (date.today() + timedelta(days=1)).isoformat()
+
+
+class SearchEventsTest(DirectoryTestCase):
+    def setUp(self):
+        DirectoryTestCase.setUp(self)
+        events = {'Date': [[_TOMORROW], None, [_TOMORROW]],
+                  'Title': [u'Linux Kennisdelen', u'Date to be announced', u'Python talk'],
+                  'Loc': [u'Room 1', u'Room 2', u'Room 3'],
+                  'Cat': [u'Powwow', u'Powwow', u'Training'],
+                  'Url': [u'http://intra/ev/1', u'http://intra/ev/2', u'http://intra/ev/3']}
+        self.parser = self.local_parser(events, {'Date': [], 'Name': [], 'Role': [], 'RelativeTime': [], 'Url': []})
+
+    def test_undated_event_that_does_not_match(self):
+        self.assertEqual([event['url'] for event in self.parser.search_events('linux')], [u'http://intra/ev/1'])
+
+    def test_undated_event_in_other_category(self):
+        filter_cat = self.parser.filter_events_category(False, False, False, True, False, False)
+        self.assertEqual([event['url'] for event in self.parser.search_events('room', filter_cat)], [u'http://intra/ev/3'])
+
+    def test_undated_event_that_matches(self):
+        self.assertRaises(RuntimeError, self.parser.search_events, 'announced')
+
+
+if __name__ == '__main__':
+    unittest.main()
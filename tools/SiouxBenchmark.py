@@ -0,0 +1,369 @@
+#!/usr/bin/python
+
+import os.path
+import sys
+import time
+import random
+import json
+import argparse
+import resource
+import subprocess
+from datetime import date, timedelta
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from SiouxParser import SiouxParser
+from SiouxParser import ConfigInput
+from SiouxParser import DataInput
+from SiouxParser import _json_default
+
+
+class _PageAdapter(object):
+    """
+    Transport adapter for requests that answers with generated pages instead of going to the intranet, so the complete
+    HTTP stack of the parser is measured without the network.\n
+    """
+    def __init__(self, pages):
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        import requests
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        page = self.pages(request.url)
+        response.status_code = 200 if page is not None else 404
+        response._content = (page or u'').encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+class SiouxBenchmark:
+    _DUTCH_MONTHS = ['jan', 'feb', 'mrt', 'apr', 'mei', 'jun', 'jul', 'aug', 'sep', 'okt', 'nov', 'dec']
+    _STAGES = ['events_intranet', 'birthdays_intranet', 'fix_events_json', 'parse_events', 'validate_day', 'birth_dates', 'load_configuration']
+    _SIZES = [10, 100, 1000, 10000, 100000]
+    _MAX_PERSONS = 1000  # Person pages are fetched one per request, keep that stage bounded.
+
+    def __init__(self, path_config_file=None, seed=0):
+        self._path_config_file = path_config_file
+        self._parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.local_json, path_config_file=path_config_file)
+        self._random = random.Random(seed)
+        self._results = []
+
+    def _categories(self):
+        p = self._parser
+        return [p._evCatSocialPartner, p._evCatSocialColleague, p._evCatPowwow, p._evCatTraining, p._evCatExpGroup, p._evPresentation]
+
+    def _event_date(self, d):
+        return u"%02d %s '%02d" % (d.day, self._DUTCH_MONTHS[d.month - 1], d.year % 100)
+
+    def generate_events_page(self, rows):
+        """
+        Generate an events overview page that matches the configured selectors.\n
+
+        :param rows: Number of events, spread over two months around today. (int)\n
+        :return: html stream (string)\n
+        """
+        p = self._parser
+        today = p._curr_date
+
+        def field(value, content):
+            return u'<%s %s="%s">%s</%s>' % (p._ev_parse_element, p._ev_parse_arg, value, content, p._ev_parse_element)
+
+        html = [u'<html><body>']
+        for i in range(rows):
+            start = today + timedelta(days=self._random.randint(-30, 30))
+            days = self._event_date(start)
+            if self._random.random() < 0.2:
+                days += u' - ' + self._event_date(start + timedelta(days=self._random.randint(1, 3)))
+            html.append(u'<div>%s%s%s%s</div>' % (field(p._ev_value_date, days),
+                                                   field(p._ev_value_title, u'<a href="/event/%d">Event %d</a>' % (i, i)),
+                                                   field(p._ev_value_location, u'Room %d' % self._random.randint(1, 20)),
+                                                   field(p._ev_value_category, self._random.choice(self._categories()))))
+        html.append(u'</body></html>')
+        return u''.join(html)
+
+    def generate_birthday_page(self, entries):
+        """
+        Generate a birthday page that matches the configured selectors.\n
+
+        :param entries: Number of birthdays, spread over the today, future and past sections. (int)\n
+        :return: html stream (string)\n
+        """
+        p = self._parser
+        roles = [p._bday_collegue, p._bday_child, p._bday_partner]
+        today = p._curr_date
+
+        def entry(i, text):
+            return u'<%s class="%s" href="/person/%d">Person %d (%s)</%s><br/>' % (p._bday_parse_separate, self._random.choice(roles), i, i, text, p._bday_parse_separate)
+
+        def day(delta):
+            d = today + timedelta(days=delta)
+            return u'%d %s' % (d.day, self._DUTCH_MONTHS[d.month - 1])
+
+        html = [u'<html><body><div>%s %s %s</div>' % (p._bday_today, p._bday_future, p._bday_past),
+                u'<%s %s="%s">' % (p._bday_parse_element, p._bday_parse_arg, p._bday_parse_overall),
+                u'<h3>%s</h3>' % p._bday_today]
+        html.extend(entry(i, u'vandaag') for i in range(entries // 10))
+        html.append(u'<h3>%s</h3>' % p._bday_future)
+        html.extend(entry(i, day(self._random.randint(1, 14))) for i in range(entries // 10, entries // 2))
+        html.append(u'<h3>%s</h3>' % p._bday_past)
+        html.extend(entry(i, day(-self._random.randint(1, 14))) for i in range(entries // 2, entries))
+        html.append(u'</%s></body></html>' % p._bday_parse_element)
+        return u''.join(html)
+
+    def generate_person_page(self, birth_date):
+        """
+        Generate a person page that matches the configured selectors.\n
+
+        :param birth_date: Birth date of the person. (datetime.date)\n
+        :return: html stream (string)\n
+        """
+        p = self._parser
+        return u'<html><body><%s %s="%s"><%s %s="%s"><%s %s="%s">%s</%s></%s></%s></body></html>' % (
+            p._p_d_tab, p._p_d_tab_arg, p._p_d_tab_value, p._p_d_rec_element, p._p_d_rec_arg, p._p_d_rec_value,
+            p._p_d_date_element, p._p_d_date_arg, p._p_d_date_value, birth_date.strftime('%d-%m-%Y'),
+            p._p_d_date_element, p._p_d_rec_element, p._p_d_tab)
+
+    def generate_events_json(self, rows):
+        """
+        Generate an events archive as written by tools/SiouxRwJson.py.\n
+
+        :param rows: Number of events. (int)\n
+        :return: JSON text (string)\n
+        """
+        return json.dumps(self._parser._parse_events_html(self.generate_events_page(rows)), default=_json_default)
+
+    def generate_birthdays_json(self, rows):
+        """
+        Generate a birthdays archive as written by tools/SiouxRwJson.py.\n
+
+        :param rows: Number of birthdays. (int)\n
+        :return: JSON text (string)\n
+        """
+        return json.dumps(self._parser._parse_birthdays_html(self.generate_birthday_page(rows)), default=_json_default)
+
+    @staticmethod
+    def _time(function, *args):
+        """
+        Time a function call, best of three runs.\n
+
+        :return: Duration in seconds. (float)\n
+        """
+        durations = []
+        for _ in range(3):
+            start = time.time()
+            function(*args)
+            durations.append(time.time() - start)
+        return min(durations)
+
+    @staticmethod
+    def _max_rss_kb():
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+    def _record(self, stage, rows, function, *args):
+        rss_before = self._max_rss_kb()
+        seconds = self._time(function, *args)
+        result = {'stage': stage, 'rows': rows, 'seconds': seconds, 'max_rss_kb': self._max_rss_kb(), 'max_rss_growth_kb': self._max_rss_kb() - rss_before}
+        self._results.append(result)
+        print '  %-20s %7d rows  %9.4fs  max rss %8d kB (+%d)' % (stage, rows, seconds, result['max_rss_kb'], result['max_rss_growth_kb'])
+
+    def _serve(self, events_page=None, birthday_page=None, persons=None):
+        """
+        Route the session of the parser to generated pages.\n
+        """
+        p = self._parser
+
+        def pages(url):
+            if url == p._eventsOverviewUrl:
+                return events_page
+            if url == p._birtdayUrl:
+                return birthday_page
+            if persons is not None and url in persons:
+                return self.generate_person_page(persons[url])
+            return None
+
+        p._session = p._create_session()
+        for prefix in set([p._base_url, p._baseIntraUrl]):
+            p._session.mount(prefix, _PageAdapter(pages))
+
+    def _cold(self, kind, loader):
+        """
+        Forget the resident data and parsed blocks, so every run parses the complete page.\n
+        """
+        def load():
+            p = self._parser
+            p._RAW_EVENTS = p._RAW_BDAYS = None
+            p._page_fingerprints = {}
+            p._blocks[kind] = {}
+            loader()
+        return load
+
+    def bench_events_intranet(self, rows):
+        self._serve(events_page=self.generate_events_page(rows))
+        self._record('events_intranet', rows, self._cold('events', self._parser._get_events_intranet))
+
+    def bench_birthdays_intranet(self, rows):
+        self._serve(birthday_page=self.generate_birthday_page(rows))
+        self._record('birthdays_intranet', rows, self._cold('birthdays', self._parser._get_recent_birthdays_intranet))
+
+    def bench_fix_events_json(self, rows):
+        text = self.generate_events_json(rows)
+        self._record('fix_events_json', rows, lambda: self._parser._fix_events_json(json.loads(text)))
+
+    def _load_events(self, rows):
+        p = self._parser
+        p._RAW_EVENTS = p._events_columns(p._fix_events_json(json.loads(self.generate_events_json(rows))))
+
+    def bench_parse_events(self, rows):
+        p = self._parser
+        self._load_events(rows)
+        filter_cat = p.filter_events_category(True, True, True, True, True, True)
+        filter_date = p.filter_events_date(one_day=True, mul_day=True, today=True, future=True, past=False)
+
+        def parse():
+            p._EVENT_INDEX = None  # Include building the index, like the first query after a refresh.
+            p.parse_events(filter_cat, filter_date)
+        self._record('parse_events', rows, parse)
+
+    def bench_validate_day(self, rows):
+        p = self._parser
+        self._load_events(rows)
+        filter_date = p.filter_events_date(one_day=True, mul_day=True, today=True, future=True, past=False)
+        dates = [days for days in p._RAW_EVENTS['Date']]
+        self._record('validate_day', rows, lambda: [p._validate_day(days, filter_date) for days in dates])
+
+    def bench_birth_dates(self, rows):
+        p = self._parser
+        rows = min(rows, self._MAX_PERSONS)
+        persons = dict((p._base_url + '/person/%d' % i, date(1960 + i % 40, i % 12 + 1, i % 28 + 1)) for i in range(rows))
+        self._serve(persons=persons)
+
+        def fetch():
+            p._birth_dates = {}
+            p._get_birth_dates(list(persons))
+        self._record('birth_dates', rows, fetch)
+
+    def _dynamodb_tables(self, dynamodb):
+        for key in SiouxParser._CONFIG_TABLES:
+            table = dynamodb.create_table(TableName='SIOUX_' + key,
+                                          KeySchema=[{'AttributeName': 'key', 'KeyType': 'HASH'}, {'AttributeName': 'value', 'KeyType': 'RANGE'}],
+                                          AttributeDefinitions=[{'AttributeName': 'key', 'AttributeType': 'S'}, {'AttributeName': 'value', 'AttributeType': 'S'}],
+                                          ProvisionedThroughput={'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10})
+            table.wait_until_exists()
+            with table.batch_writer() as batch:
+                for name, value in self._parser._conf.items(key):
+                    batch.put_item(Item={'key': name.upper(), 'value': value})
+
+    def bench_load_configuration(self, dynamodb):
+        """
+        Time the construction of a parser with ConfigInput.dynamodb, which reads all configuration tables.\n
+
+        :param dynamodb: 'moto' for an in-process stand-in or the endpoint of DynamoDB Local. (string)\n
+        """
+        import boto3
+
+        region = 'us-west-2'
+        mock = None
+        if dynamodb == 'moto':
+            try:
+                from moto import mock_dynamodb2
+            except ImportError:
+                print '  load_configuration skipped: moto is not installed'
+                return
+            mock = mock_dynamodb2()
+            mock.start()
+            os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+            os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+            endpoint = None
+        else:
+            endpoint = dynamodb
+
+        try:
+            self._dynamodb_tables(boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint))
+            self._record('load_configuration', len(SiouxParser._CONFIG_TABLES), lambda: SiouxParser(
+                config_input=ConfigInput.dynamodb, data_input=DataInput.local_json, dynamo_db_settings=[region, endpoint]))
+        finally:
+            if mock is not None:
+                mock.stop()
+
+    def _legacy_sections(self, parseable_text, entry_texts):
+        """
+        Section classification as done before the single pass extractor: a find on the page per entry.\n
+        """
+        p = self._parser
+        position_today = parseable_text.find(p._bday_today)
+        position_future = parseable_text.find(p._bday_future)
+        position_past = parseable_text.find(p._bday_past)
+        sections = []
+        for entry_text in entry_texts:
+            position_entry = parseable_text.find(entry_text)
+            if position_today < position_entry < position_future:
+                sections.append(p._TODAY)
+            elif position_future < position_entry < position_past:
+                sections.append(p._FUTURE)
+            else:
+                sections.append(p._PAST)
+        return sections
+
+    def bench_birthday_sections(self, sizes):
+        print 'Birthday page (entries / single pass parse / legacy section lookup):'
+        for size in sizes:
+            page = self.generate_birthday_page(size)
+            entry_texts = [u'Person %d (' % i for i in range(size)]
+            single_pass = self._time(self._parser._parse_birthdays_html, page)
+            legacy = self._time(self._legacy_sections, page, entry_texts)
+            print '  %7d  %8.3fs  %8.3fs' % (size, single_pass, legacy)
+
+    def run(self, sizes=None, stages=None, dynamodb=None):
+        """
+        Run the stages for every size.\n
+
+        :param sizes:    Numbers of rows. (list of ints) (default: 10 up to 100000)\n
+        :param stages:   Stages to run. (list of strings) (default: all)\n
+        :param dynamodb: DynamoDB stand-in for load_configuration: 'moto' or an endpoint. (default: stage skipped)\n
+        :return: Results (Dictionary with keys: commit, python, timestamp, results.)\n
+        """
+        stages = stages if stages is not None else self._STAGES
+        for stage in stages:
+            if stage not in self._STAGES:
+                raise RuntimeError("Unknown stage '%s'. Use one of: %s" % (stage, ', '.join(self._STAGES)))
+
+        for stage in stages:
+            if stage == 'load_configuration':
+                if dynamodb is not None:
+                    self.bench_load_configuration(dynamodb)
+                continue
+            for rows in sizes if sizes is not None else self._SIZES:
+                getattr(self, 'bench_' + stage)(rows)
+
+        try:
+            commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.realpath(__file__)), stderr=open(os.devnull, 'w')).strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {'commit': commit, 'python': sys.version.split()[0], 'timestamp': time.time(), 'results': self._results}
+
+# Main program:
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Benchmark the stages of SiouxParser on generated data.')
+    arguments.add_argument('--config', help='Directory of config.ini (default: current directory)')
+    arguments.add_argument('--sizes', type=int, nargs='+', help='Numbers of rows (default: 10 100 1000 10000 100000)')
+    arguments.add_argument('--stages', nargs='+', help='Stages to run (default: all): %s' % ', '.join(SiouxBenchmark._STAGES))
+    arguments.add_argument('--dynamodb', help="'moto' or the endpoint of DynamoDB Local, needed for load_configuration")
+    arguments.add_argument('--output', help='Write the results as JSON to this file')
+    arguments.add_argument('--birthday-sections', action='store_true', help='Compare the birthday section lookup with the legacy one')
+    options = arguments.parse_args()
+
+    benchmark = SiouxBenchmark(path_config_file=options.config)
+    if options.birthday_sections:
+        benchmark.bench_birthday_sections([100, 1000, 5000, 10000])
+    else:
+        results = benchmark.run(options.sizes, options.stages, options.dynamodb)
+        if options.output:
+            with open(options.output, 'w') as fp:
+                json.dump(results, fp, indent=4)
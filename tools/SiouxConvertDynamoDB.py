@@ -1,37 +1,44 @@
 #!/usr/bin/python
 
 import os
+import time
+import argparse
 import ConfigParser
 import boto3
 import botocore
-from boto3.dynamodb.conditions import Key, Attr
-
-dynamodb = boto3.resource('dynamodb', region_name='us-west-2', endpoint_url="http://localhost:8000")
-dynamodb_client = boto3.client('dynamodb', region_name='us-west-2')
-
-
-def delete_table(table_name):
-    try:
-        table = dynamodb.Table(table_name)
-        table.delete()
-    except:
-        print 'Could not delete table %s' % table_name
-        exit(1)
+from boto3.dynamodb.conditions import Key
 
 
 class SiouxConvertDynamoDB:
+    """
+    Sync config.ini to the Dynamo DB configuration tables of SiouxParser (ConfigInput.dynamodb).\n
+    Missing tables are created, existing tables are kept: only the entries that differ from config.ini are written and
+    entries that are no longer in config.ini are deleted, so parsers that read the configuration during a rollout keep
+    working. Every written entry gets an 'updated' timestamp, see SiouxParser._scan_config_table.\n
+    """
     # Config file
     _CONFIG_FILE = 'config.ini'
 
-    def __init__(self):
+    _THROUGHPUT = {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10}
+
+    def __init__(self, path_config_file=None, dynamo_db_settings=None):
+        """
+        :param path_config_file:   Directory of config.ini. (default: current directory) (optional)\n
+        :param dynamo_db_settings: Options for Dynamo DB. (default: ['us-west-2', 'http://localhost:8000']) (optional)\n
+        """
         self._conf = ConfigParser.ConfigParser()
-        config_file = os.path.join(os.getcwd(), self._CONFIG_FILE)
+        config_file = os.path.join(path_config_file if path_config_file is not None else os.getcwd(), self._CONFIG_FILE)
 
         if os.path.isfile(config_file):
             self._conf.read(config_file)
         else:
             raise RuntimeError("Could not locate config file '%s'." % config_file)
 
+        region = dynamo_db_settings[0] if dynamo_db_settings is not None else 'us-west-2'
+        endpoint = dynamo_db_settings[1] if dynamo_db_settings is not None else 'http://localhost:8000'
+        self._dynamodb = boto3.resource('dynamodb', region_name=region, endpoint_url=endpoint)
+        self._client = self._dynamodb.meta.client
+
         self.config = {
             'URLS': ['IIS_DOMAIN', 'BASE_INTRA', 'BASE', 'EVENTS_OVERVIEW_EXT', 'BDAY_EXT'],
             'EVENTS': ['SOCIAL_PARTNER', 'SOCIAL_COLLEAGUE', 'POWWOW', 'TRAINING', 'EXP_GROUP', 'PRESENTATION'],
@@ -40,26 +47,7 @@ class SiouxConvertDynamoDB:
             'P_D': ['TAB', 'TAB_ARG', 'TAB_VALUE', 'REC_ELEMENT', 'REC_ARG', 'REC_VALUE', 'DATE_ELEMENT', 'DATE_ARG', 'DATE_VALUE']
         }
 
-        self._init_tables()
-
-    def _init_tables(self):
-        print "Deleting all tables..."
-        delete_table('SIOUX_URLS')
-        delete_table('SIOUX_EVENTS')
-        delete_table('SIOUX_PARSE_EV')
-        delete_table('SIOUX_PARSE_BDAY')
-        delete_table('SIOUX_P_D')
-
-        self.tables = {
-            'URLS':       None,
-            'EVENTS':     None,
-            'PARSE_EV':   None,
-            'PARSE_BDAY': None,
-            'P_D':        None
-        }
-
-        print "Creating tables..."
-        self.create_tables()
+        self.tables = dict((key, self._dynamodb.Table('SIOUX_' + key)) for key in self.config)
 
     def _get_config(self, key, value):
         """
@@ -82,28 +70,125 @@ class SiouxConvertDynamoDB:
                 exit(1)
             return response['Items'][0]['value']
 
+    def _existing_tables(self):
+        names = []
+        kwargs = {}
+        while True:
+            response = self._client.list_tables(**kwargs)
+            names.extend(response['TableNames'])
+            if 'LastEvaluatedTableName' not in response:
+                return set(names)
+            kwargs['ExclusiveStartTableName'] = response['LastEvaluatedTableName']
+
+    def _missing_tables(self):
+        existing = self._existing_tables()
+        return ['SIOUX_' + key for key in sorted(self.config) if 'SIOUX_' + key not in existing]
+
     def create_tables(self):
-        for key, _ in self.config.items():
+        """
+        Create the tables that do not exist yet. All creations are requested first and then waited for, so the tables
+        are created in parallel.\n
+
+        :return: Created tables (list of strings)\n
+        """
+        missing = self._missing_tables()
+
+        for name in missing:
             try:
-                self.tables[key] = dynamodb.create_table(
-                    TableName='SIOUX_' + key,
+                self._client.create_table(
+                    TableName=name,
                     KeySchema=[{'AttributeName': 'key', 'KeyType': 'HASH'},  # Partition key
-                                {'AttributeName': 'value', 'KeyType': 'RANGE'}],  # Sort key
-                    AttributeDefinitions=[ {'AttributeName': 'key', 'AttributeType': 'S'},
-                                           {'AttributeName': 'value','AttributeType': 'S'}],
-                    ProvisionedThroughput={'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10}
+                               {'AttributeName': 'value', 'KeyType': 'RANGE'}],  # Sort key
+                    AttributeDefinitions=[{'AttributeName': 'key', 'AttributeType': 'S'},
+                                          {'AttributeName': 'value', 'AttributeType': 'S'}],
+                    ProvisionedThroughput=self._THROUGHPUT
                 )
-            except dynamodb_client.exceptions.ResourceInUseException:
-                print 'Could not create table %s' % 'SIOUX' + key
-                exit(1)
+            except self._client.exceptions.ResourceInUseException:
+                # Created by another run in the meantime, the waiter below still waits until it is active.
+                pass
+
+        waiter = self._client.get_waiter('table_exists')
+        for name in missing:
+            waiter.wait(TableName=name)
+        return missing
+
+    def _scan_table(self, key):
+        """
+        :param key: Table to read. (string)\n
+        :return: Stored entries. (set of tuples (config key, config value))\n
+        """
+        entries = set()
+        scan_kwargs = {}
+        while True:
+            response = self.tables[key].scan(**scan_kwargs)
+            entries.update((item['key'], item['value']) for item in response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return entries
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def diff(self, missing=()):
+        """
+        Compare config.ini with the tables.\n
+
+        :param missing: Tables that do not exist, they are compared as empty tables. (list of strings)\n
+        :return: Changes per table (Dictionary with table as key and a tuple (entries to put, entries to delete, number
+                 of unchanged entries) as value, entries are tuples (config key, config value).)\n
+        """
+        changes = {}
+        for key, names in self.config.items():
+            wanted = set((name, self._get_config(key, name)) for name in names)
+            stored = self._scan_table(key) if 'SIOUX_' + key not in missing else set()
+            changes[key] = (sorted(wanted - stored), sorted(stored - wanted), len(wanted & stored))
+        return changes
+
+    def sync(self, dry_run=False):
+        """
+        Create the missing tables and write the differences between config.ini and the tables.\n
+
+        :param dry_run: Only report the differences. (boolean)\n
+        :return: Report (Dictionary with keys: created, put, deleted, unchanged, seconds.)\n
+        """
+        report = {'created': [], 'put': 0, 'deleted': 0, 'unchanged': 0, 'seconds': {}}
+
+        start = time.time()
+        missing = self._missing_tables() if dry_run else []
+        if not dry_run:
+            report['created'] = self.create_tables()
+        report['seconds']['tables'] = time.time() - start
+
+        start = time.time()
+        changes = self.diff(missing)
+        report['seconds']['diff'] = time.time() - start
+
+        start = time.time()
+        for key, (puts, deletes, unchanged) in sorted(changes.items()):
+            report['put'] += len(puts)
+            report['deleted'] += len(deletes)
+            report['unchanged'] += unchanged
+            for name, value in puts:
+                print '  SIOUX_%s: put %s -> %s' % (key, name, value)
+            for name, value in deletes:
+                print '  SIOUX_%s: delete %s -> %s' % (key, name, value)
+
+        if not dry_run:
+            # All new entries are written before any old entry is deleted, so a parser that reads the tables meanwhile
+            # never misses a key. Until the old entry is deleted it reads both, and uses the newest 'updated' one.
+            updated = int(time.time() * 1000)
+            for key, (puts, _, _) in sorted(changes.items()):
+                if puts:
+                    with self.tables[key].batch_writer() as batch:
+                        for name, value in puts:
+                            batch.put_item(Item={'key': name, 'value': value, 'updated': updated})
+            for key, (_, deletes, _) in sorted(changes.items()):
+                if deletes:
+                    with self.tables[key].batch_writer() as batch:
+                        for name, value in deletes:
+                            batch.delete_item(Key={'key': name, 'value': value})
+        report['seconds']['write'] = time.time() - start
+        return report
 
     def convert(self):
-        for k_t, v_t in self.tables.items():
-            for config in self.config[k_t]:
-                response = v_t.put_item(Item={'key': config, 'value': self._get_config(k_t, config)})
-                if response['ResponseMetadata']['HTTPStatusCode'] != 200:
-                    print 'Could not add entry: %s -> %s (%s)' % (config, self._get_config(k_t, config), response)
-                    exit(1)
+        return self.sync()
 
     def scan_all_tables(self):
         print 'Result:\n'
@@ -120,10 +205,21 @@ class SiouxConvertDynamoDB:
 
 # Main program:
 if __name__ == "__main__":
-    mover = SiouxConvertDynamoDB()
-
-    print "Add config values to DynamoDB..."
-    mover.convert()
-
-    # print "Printing whole database..."
-    # mover.scan_all_tables()
+    arguments = argparse.ArgumentParser(description='Sync config.ini to the Dynamo DB configuration tables.')
+    arguments.add_argument('--config', help='Directory of config.ini (default: current directory)')
+    arguments.add_argument('--region', default='us-west-2', help='Dynamo DB region (default: us-west-2)')
+    arguments.add_argument('--endpoint', default='http://localhost:8000', help='Dynamo DB endpoint (default: http://localhost:8000)')
+    arguments.add_argument('--dry-run', action='store_true', help='Only print the differences')
+    arguments.add_argument('--scan', action='store_true', help='Print all tables afterwards')
+    options = arguments.parse_args()
+
+    mover = SiouxConvertDynamoDB(path_config_file=options.config, dynamo_db_settings=[options.region, options.endpoint])
+
+    print "Sync config values to DynamoDB%s..." % (' (dry run)' if options.dry_run else '')
+    result = mover.sync(dry_run=options.dry_run)
+    print 'Tables created: %s' % (', '.join(result['created']) or 'none')
+    print 'Entries: %d put, %d deleted, %d unchanged' % (result['put'], result['deleted'], result['unchanged'])
+    print 'Time: %s' % ', '.join('%s %.2f s' % (phase, result['seconds'][phase]) for phase in ['tables', 'diff', 'write'] if phase in result['seconds'])
+
+    if options.scan:
+        mover.scan_all_tables()
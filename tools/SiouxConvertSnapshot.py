@@ -0,0 +1,46 @@
+#!/usr/bin/python
+
+import os.path
+import json
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from SiouxParser import SiouxParser
+from SiouxParser import BinarySnapshot
+
+
+class SiouxConvertSnapshot:
+    _KINDS = {
+        'events': (BinarySnapshot.EVENTS, SiouxParser._fix_events_json),
+        'birthdays': (BinarySnapshot.BIRTHDAYS, SiouxParser._fix_birthdays_json)
+    }
+
+    def __init__(self, kind):
+        if kind not in self._KINDS:
+            raise RuntimeError("Unknown kind '%s', use one of: %s" % (kind, ', '.join(sorted(self._KINDS))))
+        self._kind, self._fix_json = self._KINDS[kind]
+
+    def to_snapshot(self, json_file, snapshot_file):
+        with open(json_file, 'r') as fp:
+            data = self._fix_json(json.load(fp))
+        BinarySnapshot.write(snapshot_file, self._kind, data)
+
+    def to_json(self, snapshot_file, json_file):
+        def default(o):
+            return o.isoformat()
+
+        data = BinarySnapshot.read(snapshot_file, self._kind)
+        with open(json_file, 'w') as fp:
+            json.dump(dict((key, list(column)) for key, column in data.items()), fp, indent=4, default=default)
+
+# Main program:
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] not in ['to-snapshot', 'to-json']:
+        print 'Usage: %s to-snapshot|to-json events|birthdays <input file> <output file>' % sys.argv[0]
+        exit(1)
+
+    converter = SiouxConvertSnapshot(sys.argv[2])
+    if sys.argv[1] == 'to-snapshot':
+        converter.to_snapshot(sys.argv[3], sys.argv[4])
+    else:
+        converter.to_json(sys.argv[3], sys.argv[4])
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+import os.path
+import subprocess
+import sys
+import json
+
+_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir)
+
+# Runs in a fresh interpreter: import SiouxParser (and optionally parse local JSON files) and report what it cost.
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, %(root)r)
+start = time.time()
+import SiouxParser
+import_time = time.time() - start
+if %(config)r is not None:
+    parser = SiouxParser.SiouxParser(config_input=SiouxParser.ConfigInput.netrc, data_input=SiouxParser.DataInput.local_json,
+                                     path_config_file=%(config)r, path_json_file=%(json)r)
+    parser.prefetch()
+json.dump({'import_time': import_time, 'modules': sorted(sys.modules)}, sys.stdout)
+"""
+
+
+class SiouxImportTime:
+    """
+    Budget check on the startup of SiouxParser: the backends that are not selected may not be imported and importing the
+    module must stay under a time budget.\n
+    Python 2 has no '-X importtime', when the interpreter supports it (Python 3.7+) its report is used to show the slowest
+    imports.\n
+    """
+    _HEAVY_MODULES = ['requests', 'requests_ntlm', 'bs4', 'boto3', 'botocore']
+    _BUDGET = 0.1
+
+    def __init__(self, python=None, budget=None):
+        self._python = python if python is not None else sys.executable
+        self._budget = budget if budget is not None else self._BUDGET
+
+    def _supports_importtime(self):
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.call([self._python, '-X', 'importtime', '-c', 'pass'], stdout=devnull, stderr=devnull) == 0
+
+    def _slowest_imports(self, probe, count=10):
+        """
+        Parse the '-X importtime' report (lines 'import time: self [us] | cumulative | imported package').\n
+
+        :return: Slowest imports (List of tuples (cumulative us, module))\n
+        """
+        process = subprocess.Popen([self._python, '-X', 'importtime', '-c', probe], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, report = process.communicate()
+        imports = []
+        for line in report.decode('utf-8', 'replace').splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                imports.append((int(parts[1]), parts[2].strip()))
+        return sorted(imports, reverse=True)[:count]
+
+    def check(self, path_config_file=None, path_json_file=None):
+        """
+        :param path_config_file: Directory of config.ini, also parse the local JSON files when given. (optional)\n
+        :param path_json_file:   Paths of the events and birthdays JSON files. (optional)\n
+        :return: Violations (List of strings)\n
+        """
+        probe = _PROBE % {'root': os.path.abspath(_ROOT), 'config': path_config_file, 'json': path_json_file}
+        output = subprocess.check_output([self._python, '-c', probe])
+        result = json.loads(output)
+
+        loaded = [module for module in self._HEAVY_MODULES if module in result['modules']]
+        print 'Import time: %.1f ms (budget %.1f ms)' % (result['import_time'] * 1000, self._budget * 1000)
+        print 'Heavy modules loaded: %s' % (', '.join(loaded) or 'none')
+
+        if self._supports_importtime():
+            print 'Slowest imports (cumulative):'
+            for cumulative, module in self._slowest_imports(probe):
+                print '  %8.1f ms  %s' % (cumulative / 1000.0, module)
+
+        violations = ["'%s' is imported although no backend needs it" % module for module in loaded]
+        if result['import_time'] > self._budget:
+            violations.append('import takes %.1f ms, the budget is %.1f ms' % (result['import_time'] * 1000, self._budget * 1000))
+        return violations
+
+# Main program:
+if __name__ == "__main__":
+    # Usage: SiouxImportTime.py [path config file] [events json] [birthdays json]
+    config_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    json_files = sys.argv[2:4] if len(sys.argv) > 3 else None
+    problems = SiouxImportTime().check(config_dir, json_files)
+    for problem in problems:
+        print 'FAIL: %s' % problem
+    exit(1 if problems else 0)
@@ -1,12 +1,252 @@
 import os.path
 import json
 import sys
-import datetime
+import csv
+import codecs
+import argparse
+from itertools import izip, izip_longest
 sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
 
 from SiouxParser import SiouxParser
 from SiouxParser import ConfigInput
 from SiouxParser import DataInput
+from SiouxParser import DateParser
+from SiouxParser import BinarySnapshot
+from SiouxParser import _JsonColumnReader
+
+_KINDS = {'events': BinarySnapshot.EVENTS, 'birthdays': BinarySnapshot.BIRTHDAYS}
+_CHUNK_SIZE = 64 * 1024
+
+
+def _schema(kind):
+    """
+    :param kind: BinarySnapshot.EVENTS or BinarySnapshot.BIRTHDAYS\n
+    :return: Columns in file order (List of tuples (key, column type of BinarySnapshot))\n
+    """
+    return BinarySnapshot._SCHEMAS[kind]
+
+
+def _rows(kind, data):
+    """
+    Iterate the rows of columnar data, with missing dates as None.\n
+
+    :param kind: BinarySnapshot.EVENTS or BinarySnapshot.BIRTHDAYS\n
+    :param data: Events in _RAW_EVENTS format or birthdays in _RAW_BDAYS format.\n
+    :return: Rows (Generator of tuples in the order of _schema)\n
+    """
+    schema = _schema(kind)
+    for row in izip(*[data[key] for key, _ in schema]):
+        yield tuple(_normalize(column_type, value) for (_, column_type), value in izip(schema, row))
+
+
+def _normalize(column_type, value):
+    if column_type == BinarySnapshot._DATE_LIST:
+        return list(value) if value else None
+    return value
+
+
+def _encode(column_type, value):
+    if column_type == BinarySnapshot._DATE_LIST:
+        return [day.isoformat() for day in value] if value else None
+    if column_type == BinarySnapshot._DATE:
+        return value.isoformat() if value is not None else None
+    return value
+
+
+def _decode(column_type, value):
+    if column_type == BinarySnapshot._DATE_LIST:
+        return [DateParser.iso(day) for day in value] if value else None
+    if column_type == BinarySnapshot._DATE:
+        return DateParser.iso(value) if value else None
+    return value
+
+
+class NdjsonWriter:
+    """
+    One JSON object per line, with ISO formatted dates.\n
+    """
+    EXTENSION = 'ndjson'
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def write(path, kind, data):
+        schema = _schema(kind)
+        with open(path, 'wb') as fp:
+            for row in _rows(kind, data):
+                record = dict((key, _encode(column_type, value)) for (key, column_type), value in izip(schema, row))
+                fp.write(json.dumps(record, sort_keys=True, separators=(',', ':')) + '\n')
+
+    @staticmethod
+    def rows(path, kind):
+        schema = _schema(kind)
+        with open(path, 'rb') as fp:
+            for line in fp:
+                record = json.loads(line)
+                yield tuple(_decode(column_type, record[key]) for key, column_type in schema)
+
+
+class CsvWriter:
+    """
+    UTF-8 CSV with a header, the dates of an event are separated by a space.\n
+    """
+    EXTENSION = 'csv'
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def _to_cell(column_type, value):
+        value = _encode(column_type, value)
+        if value is None:
+            return ''
+        if column_type == BinarySnapshot._DATE_LIST:
+            return ' '.join(value)
+        return value.encode('utf-8') if isinstance(value, unicode) else value
+
+    @staticmethod
+    def _from_cell(column_type, cell):
+        if column_type == BinarySnapshot._DATE_LIST:
+            return _decode(column_type, cell.split())
+        if column_type == BinarySnapshot._DATE:
+            return _decode(column_type, cell)
+        return cell.decode('utf-8')
+
+    @classmethod
+    def write(cls, path, kind, data):
+        schema = _schema(kind)
+        with open(path, 'wb') as fp:
+            writer = csv.writer(fp)
+            writer.writerow([key for key, _ in schema])
+            for row in _rows(kind, data):
+                writer.writerow([cls._to_cell(column_type, value) for (_, column_type), value in izip(schema, row)])
+
+    @classmethod
+    def rows(cls, path, kind):
+        schema = _schema(kind)
+        with open(path, 'rb') as fp:
+            reader = csv.reader(fp)
+            if next(reader, None) != [key for key, _ in schema]:
+                raise RuntimeError("'%s' does not have the columns of this kind." % path)
+            for cells in reader:
+                yield tuple(cls._from_cell(column_type, cell) for (_, column_type), cell in izip(schema, cells))
+
+
+class JsonWriter:
+    """
+    Compact JSON object of arrays, the format of DataInput.local_json. The columns are written element by element.\n
+    """
+    EXTENSION = 'json'
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def write(path, kind, data):
+        with open(path, 'wb') as fp:
+            fp.write('{')
+            for position, (key, column_type) in enumerate(_schema(kind)):
+                fp.write('%s%s:[' % (',' if position else '', json.dumps(key)))
+                for i, value in enumerate(data[key]):
+                    fp.write((',' if i else '') + json.dumps(_encode(column_type, value), separators=(',', ':')))
+                fp.write(']')
+            fp.write('}')
+
+    @staticmethod
+    def validate(path, kind, data):
+        """
+        Compare the file element by element with the data, one column at a time.\n
+
+        :return: None\n
+        """
+        schema = _schema(kind)
+        missing = object()
+        with open(path, 'rb') as fp:
+            reader = codecs.getreader('utf-8')(fp)
+            converters = dict((key, lambda value, column_type=column_type: _decode(column_type, value)) for key, column_type in schema)
+            columns = _JsonColumnReader(iter(lambda: reader.read(_CHUNK_SIZE), u'')).columns(converters)
+            for (key, column_type), (found_key, elements) in izip_longest(schema, columns, fillvalue=(None, None)):
+                if key is None or key != found_key:
+                    raise RuntimeError("'%s' does not have the columns of this kind." % path)
+                for i, (expected, found) in enumerate(izip_longest(data[key], elements, fillvalue=missing)):
+                    if found is missing or expected is missing:
+                        raise RuntimeError("Column '%s' of '%s' has %s rows than exported." % (key, path, 'fewer' if found is missing else 'more'))
+                    if found != _normalize(column_type, expected):
+                        raise RuntimeError("Row %d of column '%s' of '%s' differs from the export: %r instead of %r." % (i, key, path, found, expected))
+
+
+class SnapshotWriter:
+    """
+    Binary snapshot, the format of DataInput.local_snapshot (see BinarySnapshot).\n
+    """
+    EXTENSION = 'snapshot'
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def write(path, kind, data):
+        BinarySnapshot.write(path, kind, data)
+
+    @staticmethod
+    def rows(path, kind):
+        return _rows(kind, BinarySnapshot.read(path, kind))
+
+
+class SiouxExport:
+    """
+    Export events or birthdays through a writer. The file is written under a temporary name, read back and compared
+    with the exported data, and only then renamed to its path, so the path always holds a complete and valid export.\n
+    """
+    WRITERS = {'ndjson': NdjsonWriter, 'csv': CsvWriter, 'json': JsonWriter, 'snapshot': SnapshotWriter}
+
+    def __init__(self, writer, validate=True):
+        """
+        :param writer:   Name of the writer (see WRITERS) or a writer, an object with the methods write(path, kind, data) and
+                         rows(path, kind) or validate(path, kind, data).\n
+        :param validate: Read the file back before it replaces the previous export. (boolean) (default: True)\n
+        """
+        if isinstance(writer, basestring):
+            if writer not in self.WRITERS:
+                raise RuntimeError("Unknown format '%s', use one of: %s" % (writer, ', '.join(sorted(self.WRITERS))))
+            writer = self.WRITERS[writer]
+        self._writer = writer
+        self._validate = validate
+
+    def export(self, path, kind, data):
+        """
+        :param path: Output file. (string)\n
+        :param kind: 'events' or 'birthdays'. (string)\n
+        :param data: Events in _RAW_EVENTS format or birthdays in _RAW_BDAYS format.\n
+        :return: None\n
+        """
+        kind = _KINDS[kind]
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            self._writer.write(tmp_path, kind, data)
+            if self._validate:
+                self.validate(tmp_path, kind, data)
+            os.rename(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def validate(self, path, kind, data):
+        """
+        Compare a file row by row with the data it should contain, or with the validation of the writer.\n
+
+        :return: None\n
+        """
+        if hasattr(self._writer, 'validate'):
+            return self._writer.validate(path, kind, data)
+
+        missing = object()
+        for i, (expected, found) in enumerate(izip_longest(_rows(kind, data), self._writer.rows(path, kind), fillvalue=missing)):
+            if found is missing or expected is missing:
+                raise RuntimeError("'%s' has %s rows than exported." % (path, 'fewer' if found is missing else 'more'))
+            if tuple(found) != expected:
+                raise RuntimeError("Row %d of '%s' differs from the export: %r instead of %r." % (i, path, tuple(found), expected))
 
 
 class SiouxDataJson:
@@ -14,59 +254,59 @@ class SiouxDataJson:
         pass
 
     @staticmethod
-    def read_json(events, birthdays):
+    def read_json(events, birthdays, path_json_file=None):
         return_values = []
+        path_events, path_birthdays = path_json_file if path_json_file is not None else ('sioux_events.json', 'sioux_birthdays.json')
 
         if events:
             print 'Reading events from json...'
-            with open('sioux_events.json', 'r') as fp:
+            with open(path_events, 'r') as fp:
                 ev = json.load(fp)
                 return_values.append(ev)
 
         if birthdays:
             print 'Reading birthdays from json...'
-            with open('sioux_birthdays.json', 'r') as fp:
+            with open(path_birthdays, 'r') as fp:
                 bdays = json.load(fp)
                 return_values.append(bdays)
 
         return return_values
 
     @staticmethod
-    def write_json(events=None, birthdays=None):
-        def default(o):
-            if type(o) is datetime.date or type(o) is datetime.datetime:
-                return o.isoformat()
+    def write_json(events=None, birthdays=None, path_json_file=None, output_format='json'):
+        path_events, path_birthdays = path_json_file if path_json_file is not None else (None, None)
+        extension = SiouxExport.WRITERS[output_format].EXTENSION
+        exporter = SiouxExport(output_format)
 
         if events is not None:
-            print 'Writing events to json...'
-            with open('sioux_events.json', 'w') as fp:
-                json.dump(events, fp, indent=4, default=default)
+            print 'Writing events to %s...' % output_format
+            exporter.export(path_events or 'sioux_events.' + extension, 'events', events)
 
         if birthdays is not None:
-            print 'Writing birthdays to json...'
-            with open('sioux_birthdays.json', 'w') as fp:
-                json.dump(birthdays, fp, indent=4, default=default)
+            print 'Writing birthdays to %s...' % output_format
+            exporter.export(path_birthdays or 'sioux_birthdays.' + extension, 'birthdays', birthdays)
 
 # Main program:
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
-        print 'Please specify read/write'
-        exit(1)
+    arguments = argparse.ArgumentParser(description='Read or write the events and birthdays of the intranet.')
+    arguments.add_argument('action', choices=['read', 'write'])
+    arguments.add_argument('--config', help='Directory of config.ini (default: current directory)')
+    arguments.add_argument('--format', default='json', choices=sorted(SiouxExport.WRITERS), help='Output format of write (default: json)')
+    arguments.add_argument('--events', help='Events file (default: sioux_events.<format>)')
+    arguments.add_argument('--birthdays', help='Birthdays file (default: sioux_birthdays.<format>)')
+    options = arguments.parse_args()
 
     sioux_json = SiouxDataJson()
-    if str(sys.argv[1]).lower() == 'read':
-        ret = sioux_json.read_json(True, True)
+    if options.action == 'read':
+        ret = sioux_json.read_json(True, True, [options.events or 'sioux_events.json', options.birthdays or 'sioux_birthdays.json'])
 
         import pdb
         pdb.set_trace()
 
-    elif str(sys.argv[1]).lower() == 'write':
-        parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet)
-
-        print 'Retrieve events...'
-        parser._get_events_https()
+    elif options.action == 'write':
+        parser = SiouxParser(config_input=ConfigInput.netrc, data_input=DataInput.intranet, path_config_file=options.config)
 
-        print 'Retrieve birthdays...'
-        parser._get_recent_birthdays_https()
+        print 'Retrieve events and birthdays...'
+        parser.prefetch()
 
-        sioux_json.write_json(parser._RAW_EVENTS, parser._RAW_BDAYS)
+        sioux_json.write_json(parser._RAW_EVENTS, parser._RAW_BDAYS, [options.events, options.birthdays], options.format)